@@ -0,0 +1,72 @@
+"""
+Эмулятор плат esp8266, отправляющих данные по UDP.
+
+Нужен, чтобы проверить UdpReceiver без железа:
+    uv run esp-emulator.py
+"""
+import socket
+import time
+from datetime import timedelta
+
+import numpy as np
+
+from signal_sources.push import ESP_FIELDS, encode_binary_frame, encode_line_frame
+
+
+def board_samples(board: int, t: np.ndarray) -> np.ndarray:
+    """Правдоподобные показания BMP085 и A0 для моментов t (сек)"""
+    rng = np.random.default_rng(board)
+    n = len(t)
+
+    temperature = 24 + board * 0.3 + 0.05 * rng.normal(size=n)
+    pressure = 99870 + 5 * np.sin(t / 10 + board) + rng.normal(size=n)
+    altitude = 44330 * (1 - (pressure / 101325) ** (1 / 5.255))
+    sea_level = np.full(n, 99866.0)
+    real_altitude = 44330 * (1 - (pressure / 101500) ** (1 / 5.255))
+    a0 = 512 + 300 * np.sin(2 * np.pi * t + board) + 20 * rng.normal(size=n)
+
+    return np.column_stack([temperature, pressure, altitude, sea_level, real_altitude, a0])
+
+
+def emulate(
+        host: str = "127.0.0.1",
+        port: int = 4210,
+        boards: int = 10,
+        rate: float = 100.0,
+        batch: int = 10,
+        binary: bool = True,
+        duration: float | None = None,
+):
+    """
+    Каждая плата шлёт rate отсчётов в секунду пачками по batch штук.
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    period = 1 / rate
+    start = time.perf_counter()
+    sent = 0
+
+    while duration is None or time.perf_counter() - start < duration:
+        t = time.perf_counter() - start + np.arange(batch) * period
+
+        for board in range(boards):
+            device = f"esp-{board}"
+            samples = board_samples(board, t)
+
+            if binary:
+                frame = encode_binary_frame(device, samples, timedelta(seconds=period))
+            else:
+                millis = int((t[0] + board) * 1000)
+                frame = encode_line_frame(device, samples, timedelta(seconds=period), millis)
+
+            sock.sendto(frame, (host, port))
+            sent += 1
+
+        time.sleep(batch * period)
+
+    sock.close()
+    return sent
+
+
+if __name__ == "__main__":
+    print(f"Emulating {len(ESP_FIELDS)}-field boards, Ctrl+C to stop")
+    emulate()
@@ -1,13 +1,29 @@
 #include <Wire.h>
 #include <ESP8266WiFi.h>
 #include <ESP8266WebServer.h>
+#include <WiFiUdp.h>
 #include <Adafruit_BMP085.h>
 
 #include "config.h"
 
+// ===== UDP PUSH: значения по умолчанию для старых config.h =====
+#ifndef PUSH_HOST
+#define PUSH_HOST ""   // пусто — отправка выключена
+#endif
+#ifndef PUSH_PORT
+#define PUSH_PORT 4210
+#endif
+#ifndef DEVICE_ID
+#define DEVICE_ID "esp-1"
+#endif
+#ifndef PUSH_BATCH
+#define PUSH_BATCH 10
+#endif
+
 // ===== ОБЪЕКТЫ =====
 Adafruit_BMP085 bmp;
 ESP8266WebServer server(80);
+WiFiUDP udp;
 
 // ===== ДАННЫЕ =====
 float temperature;
@@ -67,6 +83,39 @@ String makeJSON() {
   return json;
 }
 
+// ===== UDP PUSH =====
+String pushBatch;
+int pushCount = 0;
+
+void pushSample() {
+  if (PUSH_HOST[0] == '\0') {
+    return;
+  }
+
+  // "@millis": приёмник восстанавливает моменты отсчётов пачки
+  pushBatch += "!";
+  pushBatch += DEVICE_ID;
+  pushBatch += "@" + String(millis());
+  pushBatch += ";" + String(temperature);
+  pushBatch += ";" + String(pressure);
+  pushBatch += ";" + String(altitude);
+  pushBatch += ";" + String(seaLevel);
+  pushBatch += ";" + String(realAltitude);
+  pushBatch += ";" + String(analogValue);
+  pushBatch += "\n";
+
+  if (++pushCount < PUSH_BATCH) {
+    return;
+  }
+
+  udp.beginPacket(PUSH_HOST, PUSH_PORT);
+  udp.write(pushBatch.c_str(), pushBatch.length());
+  udp.endPacket();
+
+  pushBatch = "";
+  pushCount = 0;
+}
+
 // ===== HTTP =====
 void handleRoot() {
   server.send(200, "application/json", makeJSON());
@@ -110,6 +159,8 @@ void loop() {
   Serial.print(analogValue);
   Serial.println();
 
+  pushSample();
+
   server.handleClient();
 
   // ===== МИГАНИЕ КАЖДЫЕ 5 СЕК =====
@@ -0,0 +1,65 @@
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+import numpy as np
+
+_MISSING = object()
+
+
+class LRUCache:
+    """Кэш последних maxsize результатов по ключу"""
+
+    def __init__(self, maxsize: int = 16):
+        self.maxsize = maxsize
+        self._items: OrderedDict[Hashable, Any] = OrderedDict()
+
+    def get(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        if key in self._items:
+            self._items.move_to_end(key)
+            return self._items[key]
+
+        value = compute()
+        self._items[key] = value
+        if len(self._items) > self.maxsize:
+            self._items.popitem(last=False)
+        return value
+
+
+class Stage:
+    """
+    Этап вычислений, который пересчитывается только при изменении входов.
+
+    Входы сравниваются по значению, а массивы — по идентичности:
+    если предыдущий этап вернул тот же объект, пересчёт не нужен.
+    """
+
+    def __init__(self, func: Callable[..., Any]):
+        self.func = func
+        self.runs = 0
+
+        self._changed = False
+        self._inputs: tuple = ()
+        self._value: Any = _MISSING
+
+    @staticmethod
+    def _same(a, b) -> bool:
+        if isinstance(a, np.ndarray) or isinstance(b, np.ndarray):
+            return a is b
+        if isinstance(a, tuple) and isinstance(b, tuple):
+            return len(a) == len(b) and all(map(Stage._same, a, b))
+        return a == b
+
+    @property
+    def changed(self) -> bool:
+        """Пересчитывался ли этап при последнем вызове"""
+        return self._changed
+
+    def __call__(self, *inputs) -> Any:
+        self._changed = self._value is _MISSING or not self._same(inputs, self._inputs)
+
+        if self._changed:
+            self._value = self.func(*inputs)
+            self._inputs = inputs
+            self.runs += 1
+
+        return self._value
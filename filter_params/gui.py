@@ -1,19 +1,60 @@
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QSlider, QLabel,
-    QApplication, QPushButton, QHBoxLayout
+    QApplication, QPushButton, QHBoxLayout, QComboBox
 )
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QThread, pyqtSignal
 
 from matplotlib.backends.backend_qtagg import (
     FigureCanvasQTAgg, NavigationToolbar2QT
 )
 from matplotlib.figure import Figure
 
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
 import numpy as np
 
 from filters.kalman import KalmanFilter
 from signals.generate import normally_noisy
-from filter_params.metrics import metrics
+from filter_params.metrics import metrics, spectral_metrics
+from filter_params.tuning import autotune
+from filter_params.cache import LRUCache, Stage
+
+# Доступные длины сигнала
+SIGNAL_LENGTHS = (300, 1_000, 3_000, 10_000, 30_000, 100_000)
+
+# Подбор Q/R идёт по началу сигнала не длиннее этого
+TUNE_SAMPLES = 20_000
+
+
+class TuneThread(QThread):
+    """Подбор параметров в фоне: интерфейс не замирает"""
+
+    done = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+    def __init__(self, noisy, free, fixed, executor, parent=None):
+        super().__init__(parent)
+        self.noisy = noisy
+        self.free = free
+        self.fixed = fixed
+        self.executor = executor
+
+    def run(self):
+        try:
+            result = autotune(
+                KalmanFilter,
+                self.noisy,
+                free=self.free,
+                fixed=self.fixed,
+                executor=self.executor,
+            )
+        except (RuntimeError, ValueError, OSError) as e:
+            self.failed.emit(str(e))
+            return
+
+        self.done.emit(result)
 
 
 class MatplotlibCanvas(FigureCanvasQTAgg):
@@ -37,6 +78,15 @@ class KalmanWindow(QWidget):
             "Seed": self.make_slider_horizontal(0, 9999, 42, "Random Seed"),
         }
 
+        self.length_box = QComboBox()
+        for length in SIGNAL_LENGTHS:
+            self.length_box.addItem(str(length), length)
+
+        length_layout = QHBoxLayout()
+        length_layout.addWidget(QLabel("Signal length"))
+        length_layout.addWidget(self.length_box)
+        length_layout.addStretch()
+
         # ===== BOTTOM sliders =====
         self.sliders = {
             "R": self.make_slider_horizontal(1, 3000, 1000, "R (measurement noise)"),
@@ -48,6 +98,14 @@ class KalmanWindow(QWidget):
         reset_btn = QPushButton("Reset sliders")
         reset_btn.clicked.connect(self.reset_values)
 
+        self.tune_btn = QPushButton("Auto-tune Q/R")
+        self.tune_btn.clicked.connect(self.auto_tune)
+        self._tune_thread: TuneThread | None = None
+        # Процессы подбора запускаются один раз и переиспользуются
+        self._tune_pool: ProcessPoolExecutor | None = None
+
+        self.tune_label = QLabel()
+
         # ===== Metrics label =====
         self.metrics_label = QLabel()
         self.metrics_label.setStyleSheet(
@@ -59,6 +117,7 @@ class KalmanWindow(QWidget):
 
         for s in self.top_sliders.values():
             layout.addLayout(s["layout"])
+        layout.addLayout(length_layout)
 
         layout.addWidget(self.toolbar)
         layout.addWidget(self.canvas)
@@ -67,11 +126,17 @@ class KalmanWindow(QWidget):
         for s in self.sliders.values():
             layout.addLayout(s["layout"])
 
-        layout.addWidget(reset_btn)
+        buttons = QHBoxLayout()
+        buttons.addWidget(reset_btn)
+        buttons.addWidget(self.tune_btn)
+        buttons.addWidget(self.tune_label)
+        layout.addLayout(buttons)
+
         self.setLayout(layout)
 
         for s in list(self.top_sliders.values()) + list(self.sliders.values()):
             s["slider"].valueChanged.connect(self.update_plot)
+        self.length_box.currentIndexChanged.connect(self.update_plot)
 
         self.filter = KalmanFilter(
             1,
@@ -82,6 +147,14 @@ class KalmanWindow(QWidget):
             1
         )
 
+        # ===== Кэш этапов: сигнал -> фильтрация -> метрики =====
+        self._signals = LRUCache(maxsize=16)
+        self.signal_stage = Stage(self._generate)
+        self.filter_stage = Stage(self._run_filter)
+        self.metrics_stage = Stage(metrics)
+        self.spectral_stage = Stage(self._spectral)
+        self._lines = None
+
         self.update_plot()
 
     def make_slider_horizontal(self, mn, mx, val, name):
@@ -112,11 +185,118 @@ class KalmanWindow(QWidget):
 
         self.update_plot()
 
+    def auto_tune(self):
+        """
+        Подбор Q и R по зашумлённому сигналу (без эталона) с текущими A и H.
+
+        Установившийся коэффициент усиления зависит только от Q/R,
+        поэтому на слайдеры выставляется найденное отношение
+        в пределах их диапазонов.
+
+        Подбор идёт в фоновом потоке по первым TUNE_SAMPLES отсчётам.
+        """
+        if self._tune_thread is not None:
+            return
+
+        A = self.sliders["A"]["slider"].value() / 100
+        H = self.sliders["H"]["slider"].value() / 100
+        Q = self.sliders["Q"]["slider"].value() / 1000
+        R = self.sliders["R"]["slider"].value()
+
+        if self._tune_pool is None:
+            self._tune_pool = ProcessPoolExecutor(
+                max_workers=min(4, os.cpu_count() or 1),
+                mp_context=get_context("spawn"),
+            )
+
+        self._tune_thread = TuneThread(
+            self.noisy[:TUNE_SAMPLES],
+            free={"Q": max(Q, 1e-3), "R": R},
+            fixed={"A": A, "H": H},
+            executor=self._tune_pool,
+            parent=self,
+        )
+        self._tune_thread.done.connect(self._apply_tuning)
+        self._tune_thread.failed.connect(self._tuning_failed)
+        self._tune_thread.finished.connect(self._tuning_finished)
+
+        self.tune_btn.setEnabled(False)
+        self.tune_label.setText("Tuning...")
+        self._tune_thread.start()
+
+    def _apply_tuning(self, result):
+        R = self.sliders["R"]["slider"].value()
+
+        ratio = result.params["Q"] / result.params["R"]
+        q_slider = self.sliders["Q"]["slider"]
+        r_slider = self.sliders["R"]["slider"]
+
+        # R как можно ближе к текущему, но так, чтобы Q уместился на слайдере
+        r_max = q_slider.maximum() / 1000 / ratio if ratio > 0 else r_slider.maximum()
+        R = min(max(min(R, int(r_max)), r_slider.minimum()), r_slider.maximum())
+
+        # Сигналы слайдеров перерисуют график
+        r_slider.setValue(R)
+        q_slider.setValue(min(round(ratio * R * 1000), q_slider.maximum()))
+
+        self.tune_label.setText(
+            f"Q = {result.params['Q']:.5f}, R = {result.params['R']:.3f}, "
+            f"log L = {result.log_likelihood:.1f}, "
+            f"{result.evaluations} evals, {result.elapsed:.2f} s"
+        )
+
+    def _tuning_failed(self, message: str):
+        print(f"Auto-tune error: '{message}'")
+        self.tune_label.setText("Auto-tune failed")
+
+    def _tuning_finished(self):
+        self._tune_thread.deleteLater()
+        self._tune_thread = None
+        self.tune_btn.setEnabled(True)
+
+    def closeEvent(self, event):
+        if self._tune_thread is not None:
+            self._tune_thread.wait()
+        if self._tune_pool is not None:
+            self._tune_pool.shutdown(cancel_futures=True)
+        super().closeEvent(event)
+
+    def _generate(self, noise: float, seed: int, length: int):
+        """Зашумлённый синус; последние сигналы хранятся в LRU-кэше"""
+        def compute():
+            signal = normally_noisy(
+                np.sin, 0, 6 * np.pi, length, noise,
+                rng=np.random.default_rng(seed),
+            )
+            for array in signal:
+                array.flags.writeable = False
+            return signal
+
+        return self._signals.get((noise, seed, length), compute)
+
+    def _run_filter(self, noisy: np.ndarray, R: float, Q: float, A: float, H: float):
+        # Новый фильтр на каждый прогон: результат не зависит от предыдущих
+        self.filter = KalmanFilter(A, H, Q, R, 0, 1)
+        return self.filter(noisy)
+
+    @staticmethod
+    def _spectral(noisy: np.ndarray, filtered: np.ndarray):
+        """
+        Спектральные метрики тестового синуса: 3 периода на отрезке 6π.
+        Шумом считается всё выше пятой гармоники синуса; частоты и
+        задержка — в единицах оси t.
+        """
+        f0 = 1 / (2 * np.pi)
+        fs = len(noisy) / (6 * np.pi)
+        return spectral_metrics(
+            noisy, filtered, fs, (5 * f0, fs / 2), freq=f0, nfft=len(noisy) // 2
+        )
+
     def update_plot(self):
         # ===== Top settings =====
         noise = self.top_sliders["Noise"]["slider"].value() / 100
         seed = self.top_sliders["Seed"]["slider"].value()
-        np.random.seed(seed)
+        length = self.length_box.currentData()
 
         # ===== Bottom settings =====
         R = self.sliders["R"]["slider"].value()
@@ -129,31 +309,45 @@ class KalmanWindow(QWidget):
             s["label"].setText(f"{s['name']}: {s['slider'].value()}")
 
         # ===== Signal & filtering =====
-        t, clear, noisy = normally_noisy(np.sin, 0, 6 * np.pi, 300, noise)
+        # Пересчитываются только этапы, входы которых изменились
+        t, clear, noisy = self.signal_stage(noise, seed, length)
+        self.noisy = noisy
 
         # with open("data.csv", "w") as f:
         #     for vals in zip(t, clear, noisy):
         #         print(*vals, sep=";", file=f)
 
-        self.filter.Q = Q
-        self.filter.R = R
-        self.filter.A = A
-        self.filter.H = H
+        filtered = self.filter_stage(noisy, R, Q, A, H)
 
-        filtered = self.filter(noisy)
+        if not (self.signal_stage.changed or self.filter_stage.changed):
+            return
 
         # ===== Plot =====
         ax = self.canvas.ax
-        ax.clear()
-        ax.plot(t, noisy, label="Noisy")
-        ax.plot(t, clear, label="Clear")
-        ax.plot(t, filtered, label="Kalman")
-        ax.legend()
-        ax.grid(True)
-        self.canvas.draw()
+        if self._lines is None:
+            ax.clear()
+            self._lines = (
+                ax.plot(t, noisy, label="Noisy")[0],
+                ax.plot(t, clear, label="Clear")[0],
+                ax.plot(t, filtered, label="Kalman")[0],
+            )
+            ax.legend()
+            ax.grid(True)
+        else:
+            noisy_line, clear_line, filtered_line = self._lines
+            if self.signal_stage.changed:
+                noisy_line.set_data(t, noisy)
+                clear_line.set_data(t, clear)
+            filtered_line.set_data(t, filtered)
+
+            # Оценка при H != 1 может выйти за пределы сигнала
+            ax.relim()
+            ax.autoscale_view()
+        self.canvas.draw_idle()
 
         # ===== Metrics =====
-        m_my = metrics(clear, noisy, filtered)
+        m_my = self.metrics_stage(clear, noisy, filtered)
+        m_spec = self.spectral_stage(noisy, filtered)
 
         text = (
             "KALMAN\n"
@@ -161,7 +355,9 @@ class KalmanWindow(QWidget):
             f"RMSE = {m_my['RMSE']:.5f}\n"
             f"MAE  = {m_my['MAE']:.5f}\n"
             f"SNR  = {m_my['SNR']:.2f} dB\n"
-            f"ΔMSE = {m_my['DELTA_MSE']:.1f} %\n\n"
+            f"ΔMSE = {m_my['DELTA_MSE']:.1f} %\n"
+            f"ATT  = {m_spec['ATTENUATION']:.1f} dB\n"
+            f"LAG  = {m_spec['LAG']:.3f} ({np.degrees(m_spec['PHASE']):.1f}°)\n\n"
 
         )
 
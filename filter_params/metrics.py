@@ -29,3 +29,63 @@ def metrics(true, noisy, filtered):
         "SNR": snr_db(true, filtered),
         "DELTA_MSE": (mse_noisy - mse_filt) / mse_noisy * 100,
     }
+
+
+# ===== Спектральные метрики =====
+
+def welch(x, fs, nfft=256):
+    """
+    Усреднённый спектр по перекрывающимся окнам Ханна (шаг nfft/2).
+
+    Returns:
+        freqs, power (nfft/2+1,), spectra (frames, nfft/2+1) — комплексные
+    """
+    x = np.asarray(x, dtype=float)
+    nfft = min(nfft, len(x))
+    frames = np.lib.stride_tricks.sliding_window_view(x, nfft)[::max(nfft // 2, 1)]
+    spectra = np.fft.rfft(frames * np.hanning(nfft), axis=-1)
+    freqs = np.fft.rfftfreq(nfft, 1 / fs)
+    return freqs, np.mean(np.abs(spectra) ** 2, axis=0), spectra
+
+
+def attenuation_db(freqs, power_raw, power_filtered, band):
+    """Подавление мощности в полосе band = (f_lo, f_hi), дБ"""
+    mask = (freqs >= band[0]) & (freqs <= band[1])
+    return 10 * np.log10(np.sum(power_raw[mask]) / np.sum(power_filtered[mask]))
+
+
+def lag_from_spectra(freqs, spectra_raw, spectra_filtered, freq=None):
+    """
+    Фазовая задержка фильтрованного сигнала относительно исходного
+    по взаимному спектру на частоте freq (по умолчанию — самой мощной
+    ненулевой частоте исходного сигнала).
+
+    Returns:
+        (фаза, рад; задержка, с)
+    """
+    cross = np.mean(spectra_filtered * np.conj(spectra_raw), axis=0)
+    power = np.mean(np.abs(spectra_raw) ** 2, axis=0)
+
+    if freq is None:
+        i = 1 + int(np.argmax(power[1:]))
+    else:
+        i = int(np.argmin(np.abs(freqs - freq)))
+
+    phase = float(np.angle(cross[i]))
+    return phase, -phase / (2 * np.pi * freqs[i])
+
+
+def spectral_metrics(noisy, filtered, fs, noise_band, freq=None, nfft=256):
+    """
+    Подавление шума в полосе noise_band и фазовая задержка фильтра.
+    Эталонный сигнал не нужен — сравниваются вход и выход фильтра.
+    """
+    freqs, p_raw, s_raw = welch(noisy, fs, nfft)
+    _, p_filt, s_filt = welch(np.ravel(filtered), fs, nfft)
+    phase, lag = lag_from_spectra(freqs, s_raw, s_filt, freq)
+
+    return {
+        "ATTENUATION": attenuation_db(freqs, p_raw, p_filt, noise_band),
+        "PHASE": phase,
+        "LAG": lag,
+    }
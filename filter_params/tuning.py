@@ -0,0 +1,220 @@
+import math
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from multiprocessing import get_context
+from typing import Callable
+
+import numpy as np
+
+from filters.base import FilterBase
+
+
+@dataclass
+class TuningResult:
+    """Результат подбора параметров"""
+
+    params: dict[str, float]
+    log_likelihood: float
+    evaluations: int
+    elapsed: float
+    # (параметры, правдоподобие) для каждого старта оптимизатора
+    starts: list[tuple[dict[str, float], float]] = field(default_factory=list)
+
+
+class _Objective:
+    """
+    Минус логарифм правдоподобия инноваций как функция ln(параметров).
+
+    Измерения приводятся к массиву (N, m) один раз; уже посчитанные
+    точки запоминаются — симплекс часто возвращается к ним.
+    """
+
+    def __init__(
+            self,
+            factory: Callable[..., FilterBase],
+            measurements: np.ndarray,
+            names: tuple[str, ...],
+            fixed: dict[str, float],
+    ):
+        self.factory = factory
+        self.measurements = measurements
+        self.names = names
+        self.fixed = fixed
+
+        self.evaluations = 0
+        self._cache: dict[tuple[float, ...], float] = {}
+
+    def __call__(self, log_params: np.ndarray) -> float:
+        key = tuple(log_params.tolist())
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+
+        params = dict(zip(self.names, np.exp(log_params).tolist()))
+        self.evaluations += 1
+
+        try:
+            f = self.factory(**self.fixed, **params)
+            value = -f.log_likelihood(self.measurements)
+        except (np.linalg.LinAlgError, FloatingPointError, ValueError):
+            value = math.inf
+
+        if not math.isfinite(value):
+            value = math.inf
+
+        self._cache[key] = value
+        return value
+
+
+def _nelder_mead(
+        func: Callable[[np.ndarray], float],
+        x0: np.ndarray,
+        step: float = 1.0,
+        max_iter: int = 200,
+        tol: float = 1e-6,
+) -> tuple[np.ndarray, float]:
+    """Симплекс-метод Нелдера — Мида (минимизация)"""
+    n = len(x0)
+    simplex = np.vstack([x0, x0 + step * np.eye(n)])
+    values = np.array([func(p) for p in simplex])
+
+    for _ in range(max_iter):
+        order = np.argsort(values)
+        simplex, values = simplex[order], values[order]
+
+        if abs(values[-1] - values[0]) <= tol * (abs(values[0]) + tol):
+            break
+
+        centroid = simplex[:-1].mean(axis=0)
+        worst = simplex[-1]
+
+        reflected = centroid + (centroid - worst)
+        fr = func(reflected)
+
+        if fr < values[0]:
+            expanded = centroid + 2 * (centroid - worst)
+            fe = func(expanded)
+            simplex[-1], values[-1] = (expanded, fe) if fe < fr else (reflected, fr)
+        elif fr < values[-2]:
+            simplex[-1], values[-1] = reflected, fr
+        else:
+            contracted = centroid + 0.5 * (worst - centroid)
+            fc = func(contracted)
+            if fc < values[-1]:
+                simplex[-1], values[-1] = contracted, fc
+            else:
+                # Сжатие всего симплекса к лучшей точке
+                simplex[1:] = simplex[0] + 0.5 * (simplex[1:] - simplex[0])
+                values[1:] = [func(p) for p in simplex[1:]]
+
+    best = int(np.argmin(values))
+    return simplex[best], float(values[best])
+
+
+# Целевая функция процесса-исполнителя: данные передаются один раз
+_worker_objective: _Objective | None = None
+
+
+def _init_worker(factory, measurements, names, fixed):
+    global _worker_objective
+    _worker_objective = _Objective(factory, measurements, names, fixed)
+
+
+def _run_start(x0: np.ndarray, max_iter: int) -> tuple[np.ndarray, float, int]:
+    objective = _worker_objective
+    before = objective.evaluations
+    x, value = _nelder_mead(objective, x0, max_iter=max_iter)
+    return x, value, objective.evaluations - before
+
+
+def _run_start_with(args: tuple, x0: np.ndarray, max_iter: int) -> tuple[np.ndarray, float, int]:
+    """Старт в общем пуле: данные приходят вместе с задачей"""
+    _init_worker(*args)
+    return _run_start(x0, max_iter)
+
+
+def autotune(
+        factory: Callable[..., FilterBase],
+        measurements,
+        free: dict[str, float],
+        fixed: dict[str, float] | None = None,
+        starts: int = 4,
+        workers: int | None = None,
+        max_iter: int = 200,
+        seed: int = 0,
+        executor: Executor | None = None,
+) -> TuningResult:
+    """
+    Подбор параметров фильтра по записанному сигналу без эталона:
+    максимизируется логарифм правдоподобия инноваций (log_likelihood).
+
+    Параметры ищутся в логарифмическом масштабе (они должны быть > 0)
+    симплекс-методом из нескольких стартов; старты выполняются
+    параллельно в процессах.
+
+    :param factory: класс фильтра или picklable функция, создающая фильтр
+        по именованным параметрам (например KalmanFilter)
+    :param measurements: измерения
+    :param free: подбираемые параметры и их начальные значения, например {"Q": 0.01, "R": 1}
+    :param fixed: постоянные параметры, например {"A": 1, "H": 1}
+    :param starts: число стартов (первый — из free, остальные — случайные вокруг него)
+    :param workers: число процессов; 1 — без процессов
+    :param max_iter: ограничение итераций симплекса на старт
+    :param seed: зерно случайных стартов
+    :param executor: готовый пул процессов, общий для повторных запусков
+        (не нужно каждый раз запускать процессы); workers тогда не используется
+
+    Пример:
+        result = autotune(KalmanFilter, z, free={"Q": 0.01, "R": 1}, fixed={"A": 1, "H": 1})
+        kalman = KalmanFilter(1, 1, **result.params)
+    """
+    started = time.perf_counter()
+
+    fixed = dict(fixed or {})
+    names = tuple(free)
+    measurements = np.asarray(measurements, dtype=float)
+    if measurements.ndim == 1:
+        measurements = measurements[:, None]
+
+    rng = np.random.default_rng(seed)
+    x0 = np.log(np.array([free[name] for name in names], dtype=float))
+    points = [x0] + [
+        x0 + rng.uniform(-2, 2, len(names)) * math.log(10)
+        for _ in range(starts - 1)
+    ]
+
+    if workers is None:
+        workers = min(starts, os.cpu_count() or 1)
+
+    args = (factory, measurements, names, fixed)
+    if executor is not None:
+        results = list(executor.map(
+            _run_start_with, [args] * len(points), points, [max_iter] * len(points)
+        ))
+    elif workers <= 1:
+        _init_worker(*args)
+        results = [_run_start(p, max_iter) for p in points]
+    else:
+        with ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=get_context("spawn"),
+                initializer=_init_worker,
+                initargs=args,
+        ) as pool:
+            results = list(pool.map(_run_start, points, [max_iter] * len(points)))
+
+    runs = [
+        (dict(zip(names, np.exp(x).tolist())), -value)
+        for x, value, _ in results
+    ]
+    params, log_likelihood = max(runs, key=lambda run: run[1])
+
+    return TuningResult(
+        params=params,
+        log_likelihood=log_likelihood,
+        evaluations=sum(n for _, _, n in results),
+        elapsed=time.perf_counter() - started,
+        starts=runs,
+    )
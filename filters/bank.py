@@ -0,0 +1,196 @@
+from typing import Iterable, Sequence
+
+import numpy as np
+from numpy.typing import DTypeLike
+
+from filters.base import FilterBase, ArrayLike
+from filters.kalman import KalmanFilter
+from filters.yazvinsky import YazvinskyFilter
+
+
+def _batch_predict(
+        x: np.ndarray,
+        P: np.ndarray,
+        A: np.ndarray,
+        Q: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Шаг прогноза для стопки фильтров: x (K, n, 1), P (K, n, n)"""
+    x = A @ x
+    P = A @ P @ A.mT + Q
+    return x, P
+
+
+def _batch_update(
+        x: np.ndarray,
+        P: np.ndarray,
+        H: np.ndarray,
+        R: np.ndarray,
+        z: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Шаг коррекции для стопки фильтров.
+
+    Returns:
+        x, P, инновация y (K, m, 1), обратная ковариация инновации S^-1 (K, m, m)
+    """
+    y = z - H @ x
+    PHt = P @ H.mT
+    S_inv = np.linalg.inv(H @ PHt + R)
+    K = PHt @ S_inv
+
+    x = x + K @ y
+    P = P - K @ H @ P
+    return x, P, y, S_inv
+
+
+class FilterBank(FilterBase):
+    """
+    Банк фильтров: K конфигураций KalmanFilter / YazvinskyFilter
+    с одинаковой размерностью состояния, работающих по одному потоку.
+
+    Все матрицы складываются в стопки (K, ...), и каждое измерение
+    обрабатывается одним векторизованным шагом прогноза и коррекции
+    вместо K отдельных вызовов one_step.
+
+    Пример:
+        bank = FilterBank([
+            KalmanFilter(1, 1, 0.001, 1),
+            KalmanFilter(1, 1, 0.01, 1),
+            YazvinskyFilter(1, 1, 0.2, 0.001),
+        ])
+        estimates = bank.filter(z)  # (N, K, n)
+
+    dtype по умолчанию — общий тип фильтров банка.
+    """
+
+    _state_fields = ("_A", "_H", "_R", "_Qn", "_Gamma", "_Q", "_x", "_P")
+
+    def __init__(
+            self,
+            filters: Sequence[KalmanFilter | YazvinskyFilter],
+            dtype: DTypeLike | None = None,
+    ) -> None:
+        if not filters:
+            raise ValueError("FilterBank needs at least one filter")
+
+        for f in filters:
+            if not isinstance(f, (KalmanFilter, YazvinskyFilter)):
+                raise TypeError(f"Unsupported filter type: {type(f).__name__}")
+
+        shapes = {(f.state.shape[0], f.H.shape[0]) for f in filters}
+        if len(shapes) != 1:
+            raise ValueError(f"Filters have different (n, m) dimensions: {shapes}")
+
+        self._dtype = np.dtype(dtype) if dtype is not None else np.result_type(*(f.dtype for f in filters))
+        d = self._dtype
+
+        self._A = np.stack([
+            f.A if isinstance(f, KalmanFilter) else f.Phi for f in filters
+        ]).astype(d)
+        self._H = np.stack([f.H for f in filters]).astype(d)
+        self._R = np.stack([f.R for f in filters]).astype(d)
+        self._x = np.stack([f.state for f in filters]).astype(d)
+        self._P = np.stack([f.covariance for f in filters]).astype(d)
+
+        # Эффективный шум процесса для прогноза:
+        # Q у Калмана, Γ Q Γ^T у Язвинского
+        self._Qn = np.stack([
+            f.Q if isinstance(f, KalmanFilter) else f.Gamma @ f.Q @ f.Gamma.T
+            for f in filters
+        ]).astype(d)
+
+        # ===== Адаптивная часть (Язвинский) =====
+        self._adaptive = np.array(
+            [i for i, f in enumerate(filters) if isinstance(f, YazvinskyFilter)],
+            dtype=np.intp,
+        )
+        adaptive = [filters[i] for i in self._adaptive]
+
+        n = self._x.shape[1]
+        if len({f.Gamma.shape for f in adaptive}) > 1:
+            raise ValueError("YazvinskyFilter members must share the Gamma shape")
+        q = adaptive[0].Gamma.shape[1] if adaptive else 0
+
+        self._Gamma = np.stack([f.Gamma for f in adaptive]).astype(d) if adaptive else np.zeros((0, n, q), dtype=d)
+        self._Q = np.stack([f.Q for f in adaptive]).astype(d) if adaptive else np.zeros((0, q, q), dtype=d)
+        self._prepare_adaptive()
+
+        self._step = 0
+
+    def _prepare_adaptive(self) -> None:
+        """Инварианты адаптивной оценки Q: зависят только от H и Γ"""
+        a = self._adaptive
+        HG = self._H[a] @ self._Gamma
+        denom = HG.mT @ HG
+        denom_sq = denom @ denom
+
+        q = denom_sq.shape[-1]
+        self._HG = HG
+        self._HPhi = self._H[a] @ self._A[a]
+        self._full_rank = np.linalg.matrix_rank(denom_sq) == q if len(a) else np.zeros(0, dtype=bool)
+
+        # Обратная матрица нужна только для невырожденных членов
+        inv = np.zeros_like(denom_sq)
+        if self._full_rank.any():
+            inv[self._full_rank] = np.linalg.inv(denom_sq[self._full_rank])
+        self._denom_sq_inv = inv
+
+    def __len__(self) -> int:
+        return self._x.shape[0]
+
+    @property
+    def state(self) -> np.ndarray:
+        """Текущие оценки состояния (K, n, 1)"""
+        return self._x
+
+    @property
+    def covariance(self) -> np.ndarray:
+        """Ковариации ошибки (K, n, n)"""
+        return self._P
+
+    def restore(self, state) -> None:
+        super().restore(state)
+        self._prepare_adaptive()
+
+    def predict(self) -> None:
+        self._x, self._P = _batch_predict(self._x, self._P, self._A, self._Qn)
+
+    def update(self, z: ArrayLike) -> None:
+        z = self._to_vector(z, self._dtype)
+        a = self._adaptive
+
+        if len(a):
+            # Адаптивная оценка Q (по прогнозной P, как в YazvinskyFilter)
+            v = z - self._H[a] @ self._x[a]
+            num = self._HG.mT @ (
+                    v @ v.mT
+                    - self._HPhi @ self._P[a] @ self._HPhi.mT
+                    - self._R[a]
+            ) @ self._HG
+            Q_hat = self._denom_sq_inv @ num
+
+            mask = self._full_rank
+            self._Q[mask] = np.where(Q_hat[mask] > 0.0, Q_hat[mask], 0.0)
+            self._Qn[a] = self._Gamma @ self._Q @ self._Gamma.mT
+
+        self._x, self._P, _, _ = _batch_update(self._x, self._P, self._H, self._R, z)
+
+    def one_step(self, x: ArrayLike) -> ArrayLike:
+        self.predict()
+        self.update(x)
+        self._step += 1
+        return self.state
+
+    def _filter_into(self, measurements: Iterable[ArrayLike], out: np.ndarray) -> int:
+        """Оценки каждого фильтра банка: out (N, K, n)"""
+        i = -1
+        for i, z in enumerate(measurements):
+            if i >= len(out):
+                raise ValueError(f"out is too short: {len(out)} rows")
+
+            self.predict()
+            self.update(z)
+            out[i] = self._x[..., 0]
+            self._step += 1
+
+        return i + 1
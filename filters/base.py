@@ -1,33 +1,227 @@
+import itertools
 from abc import ABC
-from typing import Union, Iterable
+from typing import Union, Iterable, Iterator
 
 import numpy as np
+from numpy.typing import DTypeLike
+
+from filters.state import FilterState
 
 ArrayLike = Union[float, int, np.ndarray]
 
 
 class FilterBase(ABC):
+    # Имена атрибутов, составляющих состояние фильтра (для snapshot/restore)
+    _state_fields: tuple[str, ...] = ()
+
+    # Количество обработанных измерений
+    _step: int = 0
+
+    # Тип данных матриц и рабочих массивов фильтра
+    _dtype: np.dtype = np.dtype(np.float64)
+
+    # Размер блока, которым filter() читает измерения без известной длины
+    _chunksize: int = 4096
+
+    # Параметры по шагам, которые принимает _filter_into (см. filter)
+    _step_params: tuple[str, ...] = ()
+
     def one_step(self, x: ArrayLike) -> ArrayLike:
         ...
 
-    def filter(self, measurements: Iterable[ArrayLike]) -> np.ndarray:
-        ...
+    def _filter_into(self, measurements: Iterable[ArrayLike], out: np.ndarray, **params) -> int:
+        """
+        Прогон по измерениям с записью оценок в out.
+        Подклассы переопределяют своим быстрым циклом.
+
+        Returns:
+            int: сколько оценок записано
+        """
+        if params:
+            raise TypeError(f"{type(self).__name__} doesn't support per-step parameters")
+
+        i = -1
+        for i, z in enumerate(measurements):
+            if i >= len(out):
+                raise ValueError(f"out is too short: {len(out)} rows")
+            out[i] = self.one_step(z)[..., 0]
+        return i + 1
+
+    @property
+    def _estimate_shape(self) -> tuple[int, ...]:
+        """Форма одной оценки: состояние без последней оси (n, 1) -> (n,)"""
+        return self.state.shape[:-1]
+
+    def filter(
+            self,
+            measurements: Iterable[ArrayLike],
+            out: np.ndarray | None = None,
+            **params,
+    ) -> np.ndarray:
+        """
+        Прогоняет фильтр по последовательности измерений.
+
+        :param measurements: измерения (последовательность или итератор)
+        :param out: заранее выделенный массив (N, ...) для оценок,
+            например np.memmap — тогда память не зависит от N
+        :param params: параметры модели по шагам, если фильтр их поддерживает
+            (см. KalmanFilter._filter_into)
+        :return: массив оценок (срез out, если он передан)
+        """
+        unknown = set(params) - set(self._step_params)
+        if unknown and not self._step_params:
+            raise TypeError(f"{type(self).__name__} doesn't support per-step parameters")
+        if unknown:
+            raise TypeError(
+                f"{type(self).__name__} doesn't support per-step parameters: "
+                f"{', '.join(sorted(unknown))} (expected {', '.join(self._step_params)})"
+            )
+
+        if params and not hasattr(measurements, "__len__"):
+            # Параметры по шагам привязаны к номеру измерения
+            measurements = list(measurements)
+
+        if out is None:
+            if not hasattr(measurements, "__len__"):
+                # Длина неизвестна — собираем оценки блоками
+                blocks = list(self.filter_iter(measurements, self._chunksize))
+                if not blocks:
+                    return np.empty((0, *self._estimate_shape), dtype=self._dtype)
+                return np.concatenate(blocks)
+
+            out = np.empty((len(measurements), *self._estimate_shape), dtype=self._dtype)
+
+        elif out.shape[1:] != self._estimate_shape:
+            raise ValueError(
+                f"out must have shape (N, {', '.join(map(str, self._estimate_shape))}), got {out.shape}"
+            )
+
+        return out[:self._filter_into(measurements, out, **params)]
+
+    def filter_iter(
+            self,
+            measurements: Iterable[ArrayLike],
+            chunksize: int | None = None,
+            blocks: bool = False,
+    ) -> Iterator[np.ndarray]:
+        """
+        Ленивый прогон фильтра: измерения читаются по мере надобности,
+        поэтому вход может быть бесконечным.
+
+        :param measurements: любой итерируемый объект измерений
+            или, при blocks=True, массивов измерений (k,) / (k, m)
+        :param chunksize: None — выдавать по оценке на измерение,
+            иначе — блоки оценок (chunksize, ...)
+        :param blocks: каждый элемент measurements — блок измерений;
+            он целиком идёт в быстрый цикл, а на выходе — блок оценок
+            той же длины (chunksize не используется)
+        """
+        if blocks:
+            for block in measurements:
+                out = np.empty((len(block), *self._estimate_shape), dtype=self._dtype)
+                yield out[:self._filter_into(block, out)]
+            return
+
+        if chunksize is None:
+            for z in measurements:
+                yield self.one_step(z)[..., 0].copy()
+            return
+
+        iterator = iter(measurements)
+        while chunk := list(itertools.islice(iterator, chunksize)):
+            out = np.empty((len(chunk), *self._estimate_shape), dtype=self._dtype)
+            yield out[:self._filter_into(chunk, out)]
 
     def __call__(self, measurements: Iterable[ArrayLike]) -> np.ndarray:
         return self.filter(measurements)
 
+    @property
+    def step(self) -> int:
+        """Количество обработанных измерений"""
+        return self._step
+
+    @property
+    def dtype(self) -> np.dtype:
+        """Тип данных матриц и оценок фильтра"""
+        return self._dtype
+
+    def snapshot(self) -> FilterState:
+        """Снимок текущего состояния фильтра (копии всех массивов)"""
+        return FilterState(
+            kind=type(self).__name__,
+            step=self._step,
+            arrays={
+                name.lstrip("_"): np.array(getattr(self, name), copy=True)
+                for name in self._state_fields
+            },
+        )
+
+    def restore(self, state: FilterState) -> None:
+        """
+        Восстановление состояния из снимка.
+
+        Снимок должен быть сделан фильтром того же класса
+        с совпадающими размерностями массивов.
+        """
+        if state.kind != type(self).__name__:
+            raise ValueError(
+                f"Snapshot of {state.kind} can't be restored into {type(self).__name__}"
+            )
+
+        arrays = {}
+        for name in self._state_fields:
+            current = getattr(self, name)
+            value = np.asarray(state.arrays[name.lstrip("_")], dtype=current.dtype)
+            if value.shape != current.shape:
+                raise ValueError(
+                    f"Shape mismatch for {name}: {value.shape} != {current.shape}"
+                )
+            arrays[name] = value.copy()
+
+        for name, value in arrays.items():
+            setattr(self, name, value)
+        self._step = state.step
+
+    def _per_step(self, value: ArrayLike | None, current: np.ndarray, n: int) -> np.ndarray:
+        """
+        Параметр модели в виде массива (n, ...) для индексации по шагу.
+
+        None или постоянная матрица превращаются в broadcast-представление
+        без копирования, поэтому цикл одинаков для постоянных
+        и меняющихся по шагам параметров.
+        """
+        if value is None:
+            return np.broadcast_to(current, (n, *current.shape))
+
+        value = np.asarray(value, dtype=self._dtype)
+
+        per_step = (
+                value.ndim == current.ndim + 1
+                or (value.ndim == 1 and current.shape == (1, 1))
+        )
+        if not per_step:
+            return np.broadcast_to(self._to_matrix(value, self._dtype), (n, *current.shape))
+
+        value = value.reshape(len(value), *current.shape)
+        if len(value) == 1:
+            # Один шаг — постоянный параметр (R=[2.0])
+            return np.broadcast_to(value[0], (n, *current.shape))
+        if len(value) < n:
+            raise ValueError(f"Expected at least {n} steps of parameter, got {len(value)}")
+        return value
+
     @staticmethod
-    def _to_matrix(x: ArrayLike) -> np.ndarray:
+    def _to_matrix(x: ArrayLike, dtype: DTypeLike = float) -> np.ndarray:
         """Приведение скаляра или массива к 2D-матрице"""
         if isinstance(x, (int, float)):
-            return np.array([[x]], dtype=float)
-        x = np.asarray(x, dtype=float)
+            return np.array([[x]], dtype=dtype)
+        x = np.asarray(x, dtype=dtype)
         return x if x.ndim == 2 else np.atleast_2d(x)
 
     @staticmethod
-    def _to_vector(x: ArrayLike) -> np.ndarray:
+    def _to_vector(x: ArrayLike, dtype: DTypeLike = float) -> np.ndarray:
         """Приведение скаляра или массива к вектору-столбцу"""
         if isinstance(x, (int, float)):
-            return np.array([[x]], dtype=float)
-        x = np.asarray(x, dtype=float)
+            return np.array([[x]], dtype=dtype)
+        x = np.asarray(x, dtype=dtype)
         return x.reshape(-1, 1)
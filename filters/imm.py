@@ -0,0 +1,137 @@
+import math
+from typing import Sequence
+
+import numpy as np
+from numpy.typing import DTypeLike
+
+from filters.bank import _batch_predict, _batch_update
+from filters.base import FilterBase, ArrayLike
+from filters.kalman import KalmanFilter
+
+
+class IMMFilter(FilterBase):
+    """
+    Фильтр с взаимодействующими множественными моделями (IMM).
+
+    Несколько моделей KalmanFilter с одинаковой размерностью состояния
+    переключаются марковской цепью с матрицей переходов Π:
+        Π_ij = P(модель j на шаге k | модель i на шаге k-1)
+
+    Шаг фильтра:
+        1. смешивание оценок моделей с весами μ_i Π_ij / c_j
+        2. прогноз и коррекция каждой модели
+        3. пересчёт вероятностей моделей по правдоподобию инноваций
+        4. объединение оценок с весами μ_j
+
+    Все шаги выполняются над стопками массивов (M, ...) без цикла по моделям.
+    """
+
+    _state_fields = ("_A", "_H", "_Q", "_R", "_Pi", "_xs", "_Ps", "_mu", "_x", "_P")
+
+    def __init__(
+            self,
+            models: Sequence[KalmanFilter],
+            transition: ArrayLike,
+            mu0: ArrayLike | None = None,
+            dtype: DTypeLike | None = None,
+    ) -> None:
+        if not models:
+            raise ValueError("IMMFilter needs at least one model")
+
+        shapes = {(m.state.shape[0], m.H.shape[0]) for m in models}
+        if len(shapes) != 1:
+            raise ValueError(f"Models have different (n, m) dimensions: {shapes}")
+
+        M = len(models)
+
+        self._dtype = np.dtype(dtype) if dtype is not None else np.result_type(*(m.dtype for m in models))
+        d = self._dtype
+
+        self._A = np.stack([m.A for m in models]).astype(d)
+        self._H = np.stack([m.H for m in models]).astype(d)
+        self._Q = np.stack([m.Q for m in models]).astype(d)
+        self._R = np.stack([m.R for m in models]).astype(d)
+
+        self._xs = np.stack([m.state for m in models]).astype(d)
+        self._Ps = np.stack([m.covariance for m in models]).astype(d)
+
+        self._Pi = self._to_matrix(transition, d)
+        if self._Pi.shape != (M, M):
+            raise ValueError(f"Transition matrix must be {(M, M)}, got {self._Pi.shape}")
+        if not np.allclose(self._Pi.sum(axis=1), 1.0):
+            raise ValueError("Transition matrix rows must sum to 1")
+
+        if mu0 is None:
+            self._mu = np.full(M, 1.0 / M, dtype=d)
+        else:
+            self._mu = np.asarray(mu0, dtype=d).ravel()
+            self._mu = self._mu / self._mu.sum()
+
+        self._x, self._P = self._combine()
+        self._step = 0
+
+    @property
+    def state(self) -> np.ndarray:
+        """Объединённая оценка состояния (n, 1)"""
+        return self._x
+
+    @property
+    def covariance(self) -> np.ndarray:
+        """Объединённая ковариация ошибки (n, n)"""
+        return self._P
+
+    @property
+    def probabilities(self) -> np.ndarray:
+        """Вероятности моделей μ (M,)"""
+        return self._mu
+
+    @property
+    def model_states(self) -> np.ndarray:
+        """Оценки состояния каждой модели (M, n, 1)"""
+        return self._xs
+
+    def _combine(self) -> tuple[np.ndarray, np.ndarray]:
+        mu = self._mu[:, None, None]
+        x = (mu * self._xs).sum(axis=0)
+        d = self._xs - x
+        P = (mu * (self._Ps + d @ d.mT)).sum(axis=0)
+        return x, P
+
+    def _mix(self) -> np.ndarray:
+        """Смешивание оценок моделей. Returns: c_j — прогнозные вероятности"""
+        c = self._Pi.T @ self._mu
+        W = self._Pi * self._mu[:, None] / np.where(c > 0.0, c, 1.0)
+
+        xs = np.einsum("ij,ink->jnk", W, self._xs)
+        d = self._xs[:, None] - xs[None, :]
+        Ps = (
+                np.einsum("ij,ink->jnk", W, self._Ps)
+                + np.einsum("ij,ijnk->jnk", W, d @ d.mT)
+        )
+
+        self._xs, self._Ps = xs, Ps
+        return c
+
+    def one_step(self, x: ArrayLike) -> ArrayLike:
+        z = self._to_vector(x, self._dtype)
+
+        c = self._mix()
+
+        self._xs, self._Ps = _batch_predict(self._xs, self._Ps, self._A, self._Q)
+        self._xs, self._Ps, y, S_inv = _batch_update(
+            self._xs, self._Ps, self._H, self._R, z
+        )
+
+        # ===== Правдоподобие инноваций (в логарифмах) =====
+        m = y.shape[1]
+        _, logdet_inv = np.linalg.slogdet(S_inv)
+        maha = (y.mT @ S_inv @ y)[:, 0, 0]
+        log_l = -0.5 * (maha - logdet_inv + m * math.log(2 * math.pi))
+
+        log_w = np.log(np.where(c > 0.0, c, np.finfo(self._dtype).tiny)) + log_l
+        w = np.exp(log_w - log_w.max())
+        self._mu = w / w.sum()
+
+        self._x, self._P = self._combine()
+        self._step += 1
+        return self.state
@@ -1,5 +1,7 @@
-from typing import Iterable
+import math
+from typing import Callable, Iterable
 import numpy as np
+from numpy.typing import DTypeLike
 
 from filters.base import FilterBase, ArrayLike
 
@@ -18,8 +20,14 @@ class KalmanFilter(FilterBase):
     где:
         w ~ N(0, Q)
         v ~ N(0, R)
+
+    dtype задаёт точность всех матриц и оценок (float64 по умолчанию,
+    float32 вдвое экономнее по памяти ценой ~1e-6 относительной ошибки).
     """
 
+    _state_fields = ("_A", "_H", "_Q", "_R", "_x", "_P")
+    _step_params = ("A", "H", "Q", "R", "timestamps", "model")
+
     def __init__(
             self,
             A: ArrayLike,
@@ -28,13 +36,17 @@ class KalmanFilter(FilterBase):
             R: ArrayLike,
             x0: ArrayLike = 0.0,
             P0: ArrayLike = 1.0,
+            dtype: DTypeLike = np.float64,
     ) -> None:
-        self._A = self._to_matrix(A)
-        self._H = self._to_matrix(H)
-        self._Q = self._to_matrix(Q)
-        self._R = self._to_matrix(R)
-        self._x = self._to_vector(x0)
-        self._P = self._to_matrix(P0)
+        self._dtype = np.dtype(dtype)
+        self._A = self._to_matrix(A, self._dtype)
+        self._H = self._to_matrix(H, self._dtype)
+        self._Q = self._to_matrix(Q, self._dtype)
+        self._R = self._to_matrix(R, self._dtype)
+        self._x = self._to_vector(x0, self._dtype)
+        self._P = self._to_matrix(P0, self._dtype)
+        self._I = np.eye(self._P.shape[0], dtype=self._dtype)
+        self._step = 0
 
     @property
     def state(self) -> np.ndarray:
@@ -64,19 +76,19 @@ class KalmanFilter(FilterBase):
 
     @A.setter
     def A(self, value: ArrayLike) -> None:
-        self._A = self._to_matrix(value)
+        self._A = self._to_matrix(value, self._dtype)
 
     @H.setter
     def H(self, value: ArrayLike) -> None:
-        self._H = self._to_matrix(value)
+        self._H = self._to_matrix(value, self._dtype)
 
     @Q.setter
     def Q(self, value: ArrayLike) -> None:
-        self._Q = self._to_matrix(value)
+        self._Q = self._to_matrix(value, self._dtype)
 
     @R.setter
     def R(self, value: ArrayLike) -> None:
-        self._R = self._to_matrix(value)
+        self._R = self._to_matrix(value, self._dtype)
 
     def predict(self) -> None:
         """Шаг предсказания"""
@@ -85,32 +97,208 @@ class KalmanFilter(FilterBase):
 
     def update(self, z: ArrayLike) -> None:
         """Шаг коррекции по измерению"""
-        z = self._to_vector(z)
+        z = self._to_vector(z, self._dtype)
 
         S = self._H @ self._P @ self._H.T + self._R
         K = self._P @ self._H.T @ np.linalg.inv(S)
 
         y = z - self._H @ self._x
         self._x = self._x + K @ y
-        self._P = (np.eye(self._P.shape[0]) - K @ self._H) @ self._P
+        self._P = (self._I - K @ self._H) @ self._P
 
     def one_step(self, x: ArrayLike) -> ArrayLike:
         self.predict()
         self.update(x)
+        self._step += 1
         return self.state
 
-    def filter(self, measurements: Iterable[ArrayLike]) -> np.ndarray:
+    def log_likelihood(self, measurements: Iterable[ArrayLike]) -> float:
         """
-        Прогоняет фильтр по последовательности измерений.
+        Логарифм правдоподобия инноваций на последовательности измерений:
+            sum_k -1/2 (y_k^T S_k^-1 y_k + ln|S_k| + m ln 2π)
 
-        Returns:
-            ndarray: массив оценок состояния
+        Прогоняет фильтр (состояние меняется). P, S и K не зависят
+        от измерений, поэтому после их сходимости к установившимся
+        значениям пересчитывается только x — для массива измерений
+        остаток считается блоками (см. _steady_log_likelihood).
         """
-        estimates = []
+        A, H, Q, R, I = self._A, self._H, self._Q, self._R, self._I
+        x, P = self._x, self._P
+        P_prev = P
+        const = H.shape[0] * math.log(2 * math.pi)
+
+        columns = isinstance(measurements, np.ndarray)
+        if columns:
+            # Приводим к векторам-столбцам один раз, а не на каждом шаге
+            measurements = measurements.astype(self._dtype, copy=False).reshape(len(measurements), -1, 1)
+
+        steady = False
+        K = S_inv = None
+        logdet = 0.0
+        total = 0.0
+        count = 0
 
         for z in measurements:
-            self.predict()
-            self.update(z)
-            estimates.append(self._x.ravel())
+            if steady and columns:
+                rest, x = self._steady_log_likelihood(
+                    measurements[count:], x, K, S_inv, logdet + const
+                )
+                total += rest
+                count = len(measurements)
+                break
+
+            x = A @ x
+
+            if not steady:
+                P = A @ P @ A.T + Q
+                S = H @ P @ H.T + R
+                S_inv = np.linalg.inv(S)
+                logdet = np.linalg.slogdet(S)[1]
+                K = P @ H.T @ S_inv
+
+                P_post = (I - K @ H) @ P
+                steady = np.allclose(P_post, P_prev, rtol=1e-12, atol=0)
+                P = P_prev = P_post
+
+            y = (z if columns else self._to_vector(z, self._dtype)) - H @ x
+            total -= 0.5 * ((y.T @ S_inv @ y).item() + logdet + const)
+            x = x + K @ y
+            count += 1
+
+        self._x, self._P = x, P
+        self._step += count
+        return total
+
+    def _steady_log_likelihood(
+            self,
+            Z: np.ndarray,
+            x: np.ndarray,
+            K: np.ndarray,
+            S_inv: np.ndarray,
+            offset: float,
+            block: int = 64,
+    ) -> tuple[float, np.ndarray]:
+        """
+        Правдоподобие при установившихся K и S для измерений Z (N, m, 1).
+
+        x_k = F x_{k-1} + K z_k, F = (I - K H) A — стационарная рекурсия.
+        Внутри блока из L шагов все x выражаются через x перед блоком:
+            x_i = F^(i+1) x_(-1) + sum_{j<=i} F^(i-j) K z_j,
+        поэтому блок считается одним умножением на матрицу степеней F,
+        а цикл Python идёт по блокам, а не по отсчётам.
+
+        Returns:
+            (логарифм правдоподобия, x после последнего измерения)
+        """
+        A, H = self._A, self._H
+        n = x.shape[0]
+        L = min(block, len(Z))
+
+        F = (self._I - K @ H) @ A
+        powers = [self._I]
+        for _ in range(L):
+            powers.append(F @ powers[-1])
+        powers = np.stack(powers)                            # (L+1, n, n)
+
+        # T[i, j] = F^(i-j) при j <= i, развёрнутая в (L n, L n)
+        lag = np.arange(L)[:, None] - np.arange(L)[None, :]
+        T = np.where((lag >= 0)[..., None, None], powers[np.maximum(lag, 0)], 0)
+        T = T.transpose(0, 2, 1, 3).reshape(L * n, L * n)
+
+        HA = H @ A
+        Z = Z[..., 0]
+        total = 0.0
+
+        for start in range(0, len(Z), L):
+            z = Z[start:start + L]
+            l = len(z)
+
+            u = (z @ K.T).reshape(l * n)
+            xs = (T[:l * n, :l * n] @ u).reshape(l, n) + (powers[1:l + 1] @ x)[..., 0]
+
+            prev = np.concatenate([x.T, xs[:-1]])           # x_{k-1}
+            y = z - prev @ HA.T
+            total -= 0.5 * (np.einsum("ka,ab,kb->", y, S_inv, y) + l * offset)
+            x = xs[-1][:, None]
+
+        return float(total), x
+
+    def _filter_into(
+            self,
+            measurements: Iterable[ArrayLike],
+            out: np.ndarray,
+            A: ArrayLike | None = None,
+            H: ArrayLike | None = None,
+            Q: ArrayLike | None = None,
+            R: ArrayLike | None = None,
+            timestamps: ArrayLike | None = None,
+            model: Callable[[np.ndarray], dict[str, ArrayLike]] | None = None,
+    ) -> int:
+        """
+        Прогон с параметрами модели, меняющимися по шагам.
+
+        A, H, Q, R — постоянная матрица или массив (N, ...) по шагам
+        (для скалярной модели достаточно массива (N,)). Не переданные
+        параметры берутся из фильтра; сам фильтр они не меняют.
+
+        model(dt) вызывается один раз на весь прогон и возвращает словарь
+        параметров по шагам, например {"Q": q * dt, "A": ...}. dt — массив (N,)
+        интервалов между timestamps в секундах, dt[0] = 0. timestamps — секунды,
+        datetime64 или datetime (как в SignalSource.get_buffer()).
+
+        Пример:
+            kalman.filter(z, R=r_by_gain)
+            kalman.filter(z, timestamps=ts, model=lambda dt: {"Q": 0.01 * dt})
+        """
+        # Параметры по шагам соответствуют измерениям, а не размеру out
+        n = len(measurements) if hasattr(measurements, "__len__") else len(out)
+        params = {"A": A, "H": H, "Q": Q, "R": R}
+
+        if model is not None:
+            if timestamps is None:
+                raise ValueError("model requires timestamps")
+
+            ts = np.asarray(timestamps)
+            if ts.dtype.kind == "O":
+                # datetime: секунды от первого отсчёта
+                ts = np.array([(t - ts[0]).total_seconds() for t in ts.tolist()])
+            elif ts.dtype.kind == "M":
+                ts = (ts - ts[0]) / np.timedelta64(1, "s")
+            dt = np.diff(ts.astype(np.float64), prepend=ts[0])
+
+            for name, value in model(dt).items():
+                if name not in params:
+                    raise ValueError(f"Unknown model parameter: {name}")
+                params[name] = value
+
+        As = self._per_step(params["A"], self._A, n)
+        Hs = self._per_step(params["H"], self._H, n)
+        Qs = self._per_step(params["Q"], self._Q, n)
+        Rs = self._per_step(params["R"], self._R, n)
+
+        x, P, I = self._x, self._P, self._I
+        inv = np.linalg.inv
+        dtype = self._dtype
+
+        i = -1
+        for i, z in enumerate(measurements):
+            if i >= len(out):
+                raise ValueError(f"out is too short: {len(out)} rows")
+
+            A, H = As[i], Hs[i]
+
+            # Прогноз
+            x = A @ x
+            P = A @ P @ A.T + Qs[i]
+
+            # Коррекция
+            PHt = P @ H.T
+            K = PHt @ inv(H @ PHt + Rs[i])
+            x = x + K @ (self._to_vector(z, dtype) - H @ x)
+            P = (I - K @ H) @ P
+
+            out[i] = x[:, 0]
 
-        return np.array(estimates)
+        self._x, self._P = x, P
+        self._step += i + 1
+        return i + 1
@@ -0,0 +1,160 @@
+import io
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import timedelta
+from pathlib import Path
+
+import numpy as np
+
+
+@dataclass
+class FilterState:
+    """
+    Снимок состояния фильтра.
+
+    Хранит имя класса фильтра, счётчик шагов и все массивы,
+    необходимые для продолжения работы (матрицы модели, x, P, ...).
+    Сериализуется в NPZ фиксированной структуры.
+    """
+
+    kind: str
+    step: int = 0
+    arrays: dict[str, np.ndarray] = field(default_factory=dict)
+
+    def to_bytes(self) -> bytes:
+        """Сериализация в NPZ (без сжатия)"""
+        buf = io.BytesIO()
+        np.savez(
+            buf,
+            __kind__=np.array(self.kind),
+            __step__=np.array(self.step, dtype=np.int64),
+            **self.arrays,
+        )
+        return buf.getvalue()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "FilterState":
+        with np.load(io.BytesIO(data), allow_pickle=False) as npz:
+            arrays = {
+                name: npz[name]
+                for name in npz.files
+                if not name.startswith("__")
+            }
+            return cls(
+                kind=str(npz["__kind__"]),
+                step=int(npz["__step__"]),
+                arrays=arrays,
+            )
+
+    def save(self, path: str | os.PathLike) -> None:
+        """
+        Атомарная запись на диск: сначала во временный файл,
+        затем замена — прерванная запись не портит старый снимок.
+        """
+        path = Path(path)
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_bytes(self.to_bytes())
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str | os.PathLike) -> "FilterState":
+        return cls.from_bytes(Path(path).read_bytes())
+
+
+class Checkpointer:
+    """
+    Периодическое сохранение состояния фильтра для живых источников.
+    Каналы filter_channel / bank_channels (signal_sources.derived)
+    создают его сами по параметру checkpoint.
+
+    Пример:
+        checkpoint = Checkpointer(self.filter, "mic.npz", timedelta(seconds=10))
+        checkpoint.restore()            # при старте, если снимок есть
+
+        fvalue = self.filter.one_step(value)
+        checkpoint.tick()               # после каждого шага
+
+    При background=True tick() только делает снимок (копию массивов),
+    а запись на диск идёт в отдельном потоке — так можно вызывать его
+    из callback аудио или другого потока чтения.
+    """
+
+    def __init__(
+            self,
+            filter_,
+            path: str | os.PathLike,
+            interval: timedelta = timedelta(seconds=10),
+            background: bool = False,
+    ) -> None:
+        self.filter = filter_
+        self.path = Path(path)
+        self.interval = interval
+        self.background = background
+
+        self._last_save = time.monotonic()
+
+        # Снимок, ожидающий записи (пишется только самый свежий)
+        self._pending: FilterState | None = None
+        self._wake = threading.Event()
+        self._writer: threading.Thread | None = None
+
+    def restore(self) -> bool:
+        """
+        Восстановить фильтр из снимка, если он существует.
+
+        Returns:
+            bool: True, если состояние было восстановлено
+        """
+        if not self.path.exists():
+            return False
+
+        try:
+            self.filter.restore(FilterState.load(self.path))
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Checkpoint restore error: '{e}' on file '{self.path}'")
+            return False
+
+        return True
+
+    def save(self) -> None:
+        self.filter.snapshot().save(self.path)
+        self._last_save = time.monotonic()
+
+    def tick(self) -> None:
+        """Сохранить снимок, если с прошлого сохранения прошло interval"""
+        if time.monotonic() - self._last_save < self.interval.total_seconds():
+            return
+
+        if self.background:
+            self._submit(self.filter.snapshot())
+            return
+
+        try:
+            self.save()
+        except OSError as e:
+            print(f"Checkpoint save error: '{e}' on file '{self.path}'")
+
+    def _submit(self, state: FilterState) -> None:
+        self._pending = state
+        self._last_save = time.monotonic()
+
+        if self._writer is None:
+            self._writer = threading.Thread(target=self._write_loop, daemon=True)
+            self._writer.start()
+        self._wake.set()
+
+    def _write_loop(self):
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+
+            state, self._pending = self._pending, None
+            if state is None:
+                continue
+
+            try:
+                state.save(self.path)
+            except OSError as e:
+                print(f"Checkpoint save error: '{e}' on file '{self.path}'")
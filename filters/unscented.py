@@ -0,0 +1,166 @@
+from typing import Callable, Iterable
+
+import numpy as np
+from numpy.typing import DTypeLike
+
+from filters.base import FilterBase, ArrayLike
+
+
+class UnscentedKalmanFilter(FilterBase):
+    """
+    Сигма-точечный (unscented) фильтр Калмана для нелинейных моделей.
+
+    Модель:
+        x_k = f(x_{k-1}) + w
+        z_k = h(x_k)     + v
+
+    где:
+        w ~ N(0, Q)
+        v ~ N(0, R)
+
+    f и h векторизованы: принимают массив точек (..., n) и возвращают
+    (..., n) и (..., m) соответственно. Все 2n+1 сигма-точки (и все потоки
+    в пакетном режиме) передаются одним вызовом.
+
+    При streams=B фильтр ведёт B независимых потоков с общей моделью:
+    измерение на шаге — массив (B, m), оценка — (B, n).
+
+    dtype задаёт тип оценок. Сигма-точки, веса и моменты всегда
+    считаются в float64: при alpha=1e-3 веса порядка 1e6, и их сумма
+    в float32 теряет точность.
+
+    Пример (высота по давлению BMP085):
+        ukf = UnscentedKalmanFilter(
+            fx=lambda X: X,
+            hx=lambda X: 101325 * (1 - X / 44330) ** 5.255,
+            Q=0.01, R=4, x0=120, P0=100,
+        )
+        altitude = ukf.filter(pressure)
+    """
+
+    _state_fields = ("_Q", "_R", "_x", "_P")
+
+    def __init__(
+            self,
+            fx: Callable[[np.ndarray], np.ndarray],
+            hx: Callable[[np.ndarray], np.ndarray],
+            Q: ArrayLike,
+            R: ArrayLike,
+            x0: ArrayLike = 0.0,
+            P0: ArrayLike = 1.0,
+            alpha: float = 1e-3,
+            beta: float = 2.0,
+            kappa: float = 0.0,
+            streams: int | None = None,
+            dtype: DTypeLike = np.float64,
+    ) -> None:
+        self._dtype = np.dtype(dtype)
+        self.fx = fx
+        self.hx = hx
+
+        # Тип внутренних вычислений (см. описание класса)
+        work = np.float64
+        self._Q = self._to_matrix(Q, work)
+        self._R = self._to_matrix(R, work)
+
+        self._streams = streams
+        B = streams or 1
+
+        x0 = self._to_vector(x0, work)[:, 0]
+        P0 = self._to_matrix(P0, work)
+        n = x0.shape[0]
+
+        self._x = np.tile(x0, (B, 1))
+        self._P = np.tile(P0, (B, 1, 1))
+
+        # ===== Веса сигма-точек (Merwe) =====
+        lam = alpha ** 2 * (n + kappa) - n
+        self._scale = n + lam
+
+        Wm = np.full(2 * n + 1, 0.5 / self._scale, dtype=work)
+        Wc = Wm.copy()
+        Wm[0] = lam / self._scale
+        Wc[0] = lam / self._scale + 1 - alpha ** 2 + beta
+        self._Wm, self._Wc = Wm, Wc
+
+        self._step = 0
+
+    @property
+    def state(self) -> np.ndarray:
+        """Текущая оценка состояния: (n, 1) или (B, n, 1) в пакетном режиме"""
+        x = self._x.astype(self._dtype, copy=False)
+        if self._streams is None:
+            return x[0][:, None]
+        return x[..., None]
+
+    @property
+    def covariance(self) -> np.ndarray:
+        """Ковариация ошибки: (n, n) или (B, n, n)"""
+        P = self._P.astype(self._dtype, copy=False)
+        if self._streams is None:
+            return P[0]
+        return P
+
+    @property
+    def Q(self) -> np.ndarray:
+        return self._Q
+
+    @property
+    def R(self) -> np.ndarray:
+        return self._R
+
+    def _sigma_points(self) -> np.ndarray:
+        """Сигма-точки всех потоков: (B, 2n+1, n)"""
+        L = np.linalg.cholesky(self._scale * self._P)
+        offsets = L.mT
+        x = self._x[:, None, :]
+        return np.concatenate([x, x + offsets, x - offsets], axis=1)
+
+    def _moments(self, Y: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Взвешенное среднее и отклонения точек Y (B, 2n+1, k)"""
+        mean = np.einsum("s,bsk->bk", self._Wm, Y)
+        return mean, Y - mean[:, None, :]
+
+    def predict(self) -> None:
+        """Шаг прогноза"""
+        X = self.fx(self._sigma_points())
+        self._x, dX = self._moments(X)
+        self._P = np.einsum("s,bsi,bsj->bij", self._Wc, dX, dX) + self._Q
+
+    def update(self, z: ArrayLike) -> None:
+        """Шаг коррекции по измерению"""
+        m = self._R.shape[0]
+        z = np.asarray(z, dtype=np.float64).reshape(-1, m)
+
+        X = self._sigma_points()
+        _, dX = self._moments(X)
+        z_mean, dZ = self._moments(self.hx(X))
+
+        S = np.einsum("s,bsi,bsj->bij", self._Wc, dZ, dZ) + self._R
+        Pxz = np.einsum("s,bsi,bsj->bij", self._Wc, dX, dZ)
+        K = Pxz @ np.linalg.inv(S)
+
+        self._x = self._x + (K @ (z - z_mean)[..., None])[..., 0]
+        P = self._P - K @ S @ K.mT
+        self._P = 0.5 * (P + P.mT)
+
+    def one_step(self, x: ArrayLike) -> ArrayLike:
+        self.predict()
+        self.update(x)
+        self._step += 1
+        return self.state
+
+    def _filter_into(self, measurements: Iterable[ArrayLike], out: np.ndarray) -> int:
+        single = self._streams is None
+
+        i = -1
+        for i, z in enumerate(measurements):
+            if i >= len(out):
+                raise ValueError(f"out is too short: {len(out)} rows")
+
+            self.predict()
+            self.update(z)
+            out[i] = self._x[0] if single else self._x
+            self._step += 1
+
+        return i + 1
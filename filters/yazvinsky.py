@@ -1,6 +1,8 @@
+import math
 from typing import Iterable
 
 import numpy as np
+from numpy.typing import DTypeLike
 
 from filters.base import FilterBase, ArrayLike
 
@@ -18,6 +20,8 @@ class YazvinskyFilter(FilterBase):
             v_k ~ N(0, R)
         """
 
+    _state_fields = ("_Phi", "_H", "_Gamma", "_R", "_x", "_P", "_Q")
+
     def __init__(
             self,
             Phi: ArrayLike,
@@ -26,22 +30,42 @@ class YazvinskyFilter(FilterBase):
             R: ArrayLike,
             x0: ArrayLike = 0,
             P0: ArrayLike = 1,
+            dtype: DTypeLike = np.float64,
     ) -> None:
-        self._Phi = self._to_matrix(Phi)
-        self._H = self._to_matrix(H)
-        self._R = self._to_matrix(R)
-        self._Gamma = self._to_matrix(Gamma)
+        self._dtype = np.dtype(dtype)
+        self._Phi = self._to_matrix(Phi, self._dtype)
+        self._H = self._to_matrix(H, self._dtype)
+        self._R = self._to_matrix(R, self._dtype)
+        self._Gamma = self._to_matrix(Gamma, self._dtype)
 
-        self._x = self._to_vector(x0)
-        self._P = self._to_matrix(P0)
+        self._x = self._to_vector(x0, self._dtype)
+        self._P = self._to_matrix(P0, self._dtype)
 
         n = self._x.shape[0]
         q = self._Gamma.shape[1]
 
         # Адаптивная ковариация шума процесса
-        self._Q = np.zeros((q, q))
+        self._Q = np.zeros((q, q), dtype=self._dtype)
+
+        self._I = np.eye(n, dtype=self._dtype)
+        self._prepare_adaptive()
+        self._step = 0
+
+    def _prepare_adaptive(self) -> None:
+        """Инварианты адаптивной оценки Q: зависят только от Φ, H и Γ"""
+        HG = self._H @ self._Gamma
+        denom = HG.T @ HG  # (q×q)
+        denom_sq = denom @ denom  # [(HG)^T HG]^2
+
+        self._HG = HG
+        self._HPhi = self._H @ self._Phi
+        # проверяем обратимость
+        self._full_rank = np.linalg.matrix_rank(denom_sq) == denom_sq.shape[0]
+        self._denom_sq_inv = np.linalg.inv(denom_sq) if self._full_rank else None
 
-        self._I = np.eye(n)
+    def restore(self, state) -> None:
+        super().restore(state)
+        self._prepare_adaptive()
 
 
     @property
@@ -59,6 +83,22 @@ class YazvinskyFilter(FilterBase):
         """Адаптивная оценка ковариации шума процесса"""
         return self._Q
 
+    @property
+    def Phi(self) -> np.ndarray:
+        return self._Phi
+
+    @property
+    def H(self) -> np.ndarray:
+        return self._H
+
+    @property
+    def Gamma(self) -> np.ndarray:
+        return self._Gamma
+
+    @property
+    def R(self) -> np.ndarray:
+        return self._R
+
     def predict(self) -> None:
         """Шаг прогноза"""
         self._x = self._Phi @ self._x
@@ -69,33 +109,35 @@ class YazvinskyFilter(FilterBase):
 
     def update(self, z: ArrayLike) -> None:
         """Шаг коррекции + адаптация Q (Язвицкий)"""
-        z = self._to_vector(z)
+        z = self._to_vector(z, self._dtype)
 
         # ===== Инновация =====
         v = z - self._H @ self._x
+        S = self._H @ self._P @ self._H.T + self._R
 
-        # ===== Адаптивная оценка Q =====
-        HG = self._H @ self._Gamma
+        self._adapt(v)
+        self._correct(v, np.linalg.inv(S))
 
-        denom = HG.T @ HG  # (q×q)
-        denom_sq = denom @ denom  # [(HG)^T HG]^2
+    def _adapt(self, v: np.ndarray) -> None:
+        """Адаптивная оценка Q по инновации v (инварианты — _prepare_adaptive)"""
+        if not self._full_rank:
+            return
 
-        # проверяем обратимость
-        if np.linalg.matrix_rank(denom_sq) == denom_sq.shape[0]:
-            num = HG.T @ (
-                    v @ v.T
-                    - self._H @ self._Phi @ self._P @ self._Phi.T @ self._H.T
-                    - self._R
-            ) @ HG
+        num = self._HG.T @ (
+                v @ v.T
+                - self._HPhi @ self._P @ self._HPhi.T
+                - self._R
+        ) @ self._HG
 
-            Q_hat = np.linalg.inv(denom_sq) @ num
+        Q_hat = self._denom_sq_inv @ num
 
-            # Условие (14): только положительные значения
-            self._Q = np.where(Q_hat > 0.0, Q_hat, 0.0)
+        # Условие (14): только положительные значения
+        self._Q = np.where(Q_hat > 0.0, Q_hat, 0.0)
 
+    def _correct(self, v: np.ndarray, S_inv: np.ndarray) -> None:
+        """Коррекция по инновации v и обратной ковариации инновации S_inv"""
         # ===== Калмановский коэффициент =====
-        S = self._H @ self._P @ self._H.T + self._R
-        K = self._P @ self._H.T @ np.linalg.inv(S)
+        K = self._P @ self._H.T @ S_inv
 
         # ===== Коррекция =====
         self._x = self._x + K @ v
@@ -105,22 +147,47 @@ class YazvinskyFilter(FilterBase):
     def one_step(self, x: ArrayLike) -> ArrayLike:
         self.predict()
         self.update(x)
+        self._step += 1
         return self.state
 
-    def filter(self, measurements: Iterable[ArrayLike]) -> np.ndarray:
+    def log_likelihood(self, measurements: Iterable[ArrayLike]) -> float:
         """
-        Прогон фильтра по последовательности измерений.
+        Логарифм правдоподобия инноваций на последовательности измерений:
+            sum_k -1/2 (v_k^T S_k^-1 v_k + ln|S_k| + m ln 2π)
 
-        Returns
-        -------
-        ndarray (N, n)
-            Оценки состояния
+        Прогоняет фильтр (состояние меняется).
         """
-        estimates = []
+        const = self._H.shape[0] * math.log(2 * math.pi)
+        total = 0.0
 
         for z in measurements:
             self.predict()
+
+            S = self._H @ self._P @ self._H.T + self._R
+            S_inv = np.linalg.inv(S)
+            v = self._to_vector(z, self._dtype) - self._H @ self._x
+            total -= 0.5 * (
+                    (v.T @ S_inv @ v).item()
+                    + np.linalg.slogdet(S)[1]
+                    + const
+            )
+
+            # Та же коррекция, что в update, без повторного расчёта S
+            self._adapt(v)
+            self._correct(v, S_inv)
+            self._step += 1
+
+        return total
+
+    def _filter_into(self, measurements: Iterable[ArrayLike], out: np.ndarray) -> int:
+        i = -1
+        for i, z in enumerate(measurements):
+            if i >= len(out):
+                raise ValueError(f"out is too short: {len(out)} rows")
+
+            self.predict()
             self.update(z)
-            estimates.append(self._x.ravel())
+            out[i] = self._x[:, 0]
+            self._step += 1
 
-        return np.asarray(estimates)
\ No newline at end of file
+        return i + 1
\ No newline at end of file
@@ -3,13 +3,30 @@ from datetime import timedelta
 
 import matplotlib.dates as mdates
 import matplotlib.pyplot as plt
+import numpy as np
 from matplotlib.animation import FuncAnimation
 
+from signal_sources.buffer import to_datetime64
 from signal_sources.generated import GeneratedSource
-
-
-def plot_signals(*sources, lifetime: timedelta = timedelta(seconds=5), interval=30):
-    fig, ax = plt.subplots()
+from signals.spectrum import SpectrumEngine
+
+
+def plot_signals(*sources, lifetime: timedelta = timedelta(seconds=5), interval=30, spectrum=None):
+    """
+    :param spectrum: источник, для которого под графиком рисуется
+        спектрограмма (SpectrumEngine считает только новые окна)
+    """
+    if spectrum is None:
+        fig, ax = plt.subplots()
+    else:
+        fig, (ax, spec_ax) = plt.subplots(2, 1)
+        engine = SpectrumEngine(spectrum)
+        image = spec_ax.imshow(
+            engine.spectrogram().T, origin="lower", aspect="auto", cmap="magma"
+        )
+        spec_ax.set_xlabel("Окно")
+        spec_ax.set_ylabel("Частота, Гц")
+        spec_ax.set_title(spectrum.title)
 
     lines = []
     for source in sources:
@@ -23,23 +40,38 @@ def plot_signals(*sources, lifetime: timedelta = timedelta(seconds=5), interval=
 
     def update(frame):
         any_data = False
+        now = datetime.datetime.now()
+
+        # Не больше точки на пиксель: длинная история берётся из агрегатов
+        width = max(int(ax.bbox.width), 1)
 
         for src, line in zip(sources, lines):
-            buffer = src.get_buffer()
-            if not buffer:
+            ts, mn, mx, _ = src.get_range(now - lifetime, now, width)
+            if not len(ts):
                 continue
 
-            ts, values = zip(*buffer)
-            line.set_data(ts, values)
+            # Огибающая min/max: для каждой точки вертикальный отрезок
+            line.set_data(
+                to_datetime64(np.repeat(ts, 2)),
+                np.column_stack([mn, mx]).ravel(),
+            )
             any_data = True
 
         if any_data:
-            now = datetime.datetime.now()
             ax.set_xlim(now - lifetime, now)
             ax.relim()
             ax.autoscale_view()
 
-        return lines
+        if spectrum is None or not engine.update():
+            return lines
+
+        # Изображение обновляется на месте; шкала — по заполненной части
+        power = engine.spectrogram()
+        image.set_data(power.T)
+        # Пока fs не оценена, freqs — в долях частоты дискретизации
+        image.set_extent((0, engine.frames, 0, engine.freqs[-1]))
+        image.set_clim(np.nanpercentile(power, 5), np.nanmax(power))
+        return lines + [image]
 
     ani = FuncAnimation(fig, update, interval=interval)
     plt.show()
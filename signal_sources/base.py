@@ -1,14 +1,60 @@
+import threading
 from abc import ABC, abstractmethod
 from datetime import datetime, timedelta
-import heapq
-from typing import List, Tuple
+from typing import Callable, Dict, List, Sequence, Tuple
+
+import numpy as np
+from numpy.typing import DTypeLike
+
+from signal_sources.buffer import SampleBuffer, to_seconds, from_seconds
+from signal_sources.reorder import ReorderBuffer
+from signal_sources.rollup import default_tiers, downsample
 
 
 class SignalSource(ABC):
-    def __init__(self, livetime: timedelta, title="MyGraph"):
+    def __init__(
+            self,
+            livetime: timedelta,
+            title="MyGraph",
+            dtype: DTypeLike = np.float64,
+            lateness: timedelta = timedelta(0),
+            history: timedelta | None = None,
+    ):
+        """
+        :param livetime: сколько хранить отсчёты
+        :param title: подпись на графике
+        :param dtype: тип хранимых значений
+        :param lateness: на сколько отсчёт может опоздать относительно
+            самого свежего и всё ещё пройти к подписчикам по порядку.
+            Опоздавшие сильнее не теряются, а вставляются в буфер
+            на своё место (см. _insert_late)
+        :param history: сколько хранить агрегаты (min/max/mean) поверх
+            livetime полного разрешения; None — без агрегатов
+        """
         self._title = title
         self.livetime = livetime
-        self._queue: List[Tuple[datetime, float]] = []
+        self._buffer = SampleBuffer(dtype)
+        self._reorder = ReorderBuffer(lateness)
+        self._tiers = default_tiers(history, dtype) if history else []
+        self._ingest_lock = threading.Lock()
+        self._listeners: List[Callable[[float, datetime], None]] = []
+        # Отсчёты, опоздавшие сильнее lateness и вставленные в буфер
+        self._inserted = 0
+
+    @property
+    def dtype(self) -> np.dtype:
+        """Тип данных, в котором хранятся значения"""
+        return self._buffer.dtype
+
+    @staticmethod
+    def _scalar(value):
+        """
+        Значение отсчёта. Массив из одного элемента (например результат
+        filter.one_step формы (1, 1)) превращается в скаляр
+        """
+        if isinstance(value, np.ndarray):
+            return value.item()
+        return value
 
     def _append(self, value: float, ts: datetime | None = None):
         """
@@ -18,9 +64,85 @@ class SignalSource(ABC):
         if ts is None:
             ts = datetime.now()
 
-        heapq.heappush(self._queue, (ts, value))
+        value = self._scalar(value)
+        with self._ingest_lock:
+            self._release(self._ingest(to_seconds(ts), value))
         self._cleanup()
 
+    def _extend(self, values: Sequence[float], ts: Sequence[datetime]):
+        """
+        Добавить пачку значений с таймстемпами.
+        Дешевле, чем _append для каждого значения.
+        """
+        values = np.asarray(values)
+        if values.ndim > 1:
+            values = values.reshape(len(values))
+
+        with self._ingest_lock:
+            released = []
+            for t, value in zip(ts, values):
+                released.extend(self._ingest(to_seconds(t), value))
+            self._release(released)
+        self._cleanup()
+
+    def _ingest(self, seconds: float, value) -> List[Tuple[float, float]]:
+        """
+        Отсчёт в окно переупорядочивания (вызывается под _ingest_lock).
+        Возвращает отсчёты, готовые к выпуску.
+        """
+        released = self._reorder.push(seconds, value)
+        if released is None:
+            self._insert_late(seconds, value)
+            return []
+        return released
+
+    def _insert_late(self, seconds: float, value):
+        """
+        Отсчёт опоздал сильнее lateness: он вставляется на своё место
+        в буфер и агрегаты, как это делала прежняя куча. Подписчикам
+        (фильтрам) он не передаётся — их вход остаётся упорядоченным.
+        """
+        if not self._inserted:
+            print(
+                f"{self.title}: sample later than lateness "
+                f"({self._reorder.lateness:.3f} s) stored without listeners, "
+                f"see get_stats()['inserted']"
+            )
+
+        self._buffer.insert(seconds, value)
+        for tier in self._tiers:
+            tier.merge(seconds, float(value))
+        self._inserted += 1
+
+    def _release(self, samples: List[Tuple[float, float]]):
+        """
+        Запись упорядоченных отсчётов в буфер и уведомление подписчиков
+        """
+        if not samples:
+            return
+
+        if len(samples) == 1:
+            self._buffer.append(*samples[0])
+        else:
+            seconds, values = zip(*samples)
+            self._buffer.extend(seconds, values)
+
+        for seconds, value in samples:
+            for tier in self._tiers:
+                tier.add(seconds, float(value))
+
+            if self._listeners:
+                ts = from_seconds(seconds)
+                for listener in self._listeners:
+                    listener(value, ts)
+
+    def subscribe(self, listener: Callable[[float, datetime], None]):
+        """
+        Подписка на новые значения: listener(value, ts)
+        вызывается для каждого отсчёта в порядке времени
+        """
+        self._listeners.append(listener)
+
     def _cleanup(self):
         """
         Удаляет все элементы, которые старше livetime
@@ -29,34 +151,123 @@ class SignalSource(ABC):
             return
 
         threshold = datetime.now() - self.livetime
+        self._buffer.drop_before(to_seconds(threshold))
+
+    def _flush_pending(self):
+        """
+        Выпускает ожидающие отсчёты, которые опоздали больше чем на lateness
+        относительно текущего времени (если новых отсчётов давно не было)
+        """
+        if len(self._reorder):
+            with self._ingest_lock:
+                self._release(self._reorder.advance(to_seconds(datetime.now())))
 
-        while self._queue and self._queue[0][0] < threshold:
-            heapq.heappop(self._queue)
+    def get_arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Таймстемпы (float64 секунды, см. signal_sources.buffer)
+        и значения (dtype источника), отсортированные по времени
+        """
+        self._flush_pending()
+        self._cleanup()
+        return self._buffer.arrays()
+
+    def get_since(self, total: int) -> Tuple[np.ndarray, np.ndarray, int]:
+        """
+        Новые отсчёты для инкрементальной обработки.
+
+        :param total: значение счётчика из предыдущего вызова (0 — всё, что есть)
+        :return: ts, values и новое значение счётчика
+        """
+        self._flush_pending()
+        self._cleanup()
+        return self._buffer.since(total)
 
     def get_buffer(self) -> List[Tuple[datetime, float]]:
         """
         Возвращает актуальный список значений
         (отсортирован по времени)
         """
-        self._cleanup()
-        return sorted(list(self._queue), key=lambda x: x[0])
-
+        ts, values = self.get_arrays()
+        return [(from_seconds(t), v) for t, v in zip(ts.tolist(), values.tolist())]
 
     def get_values(self) -> List[float]:
         """
         Только значения (без ts)
         """
-        self._cleanup()
-        return [value for _, value in self._queue]
+        _, values = self.get_arrays()
+        return values.tolist()
 
     def get_latest(self) -> Tuple[datetime, float] | None:
         """
         Последнее по времени значение
         """
+        self._flush_pending()
         self._cleanup()
-        if not self._queue:
+        latest = self._buffer.latest()
+        if latest is None:
             return None
-        return max(self._queue, key=lambda x: x[0])
+        ts, value = latest
+        return from_seconds(ts), value.item()
+
+    def get_range(
+            self,
+            start: datetime,
+            end: datetime,
+            max_points: int = 1000,
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Отсчёты за [start, end] с разрешением не больше max_points точек.
+
+        start сдвигается к самому старому хранимому отсчёту. Из уровней,
+        которые покрывают этот момент (или хранят всё с начала), берётся
+        самый грубый, у которого в интервале не меньше max_points ячеек,
+        и прореживается до max_points. Если таких нет — самый подробный
+        (полное разрешение). Стоимость — порядка max_points ячеек,
+        а не длины интервала.
+
+        Returns:
+            ts (секунды), min, max, mean
+        """
+        self._flush_pending()
+        self._cleanup()
+
+        lo, hi = to_seconds(start), to_seconds(end)
+        levels = [self._buffer, *self._tiers]
+
+        # Раньше самого старого отсчёта данных нет ни на одном уровне
+        lo = max(lo, min(level.oldest for level in levels))
+        covering = [level for level in levels if level.oldest <= lo or level.complete]
+
+        # Уровни агрегатов — от грубого к подробному; ячеек в интервале ~ длина / разрешение
+        level = next(
+            (
+                tier for tier in reversed(covering)
+                if tier is not self._buffer and (hi - lo) / tier.resolution >= max_points
+            ),
+            covering[0] if covering else self._buffer,
+        )
+
+        if level is self._buffer:
+            ts, values = self._buffer.range(lo, hi)
+            ts, mn, mx, mean, _ = downsample(
+                ts, values, values, values, np.ones(len(ts), dtype=np.int64), max_points
+            )
+            return ts, mn, mx, mean
+
+        ts, mn, mx, mean, _ = downsample(*level.query(lo, hi), max_points)
+        return ts, mn, mx, mean
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Счётчики приёма: опоздавшие, но выпущенные по порядку (late),
+        опоздавшие сильнее lateness и вставленные в буфер (inserted)
+        и ожидающие в окне (pending)
+        """
+        return {
+            "late": self._reorder.late,
+            "inserted": self._inserted,
+            "pending": len(self._reorder),
+        }
 
     @property
     def title(self):
@@ -0,0 +1,177 @@
+import threading
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Sequence
+
+import numpy as np
+from numpy.typing import DTypeLike
+
+# Таймстемпы хранятся как секунды от наивной эпохи:
+# без часовых поясов, как и datetime.now()
+EPOCH = datetime(1970, 1, 1)
+
+
+def to_seconds(ts: datetime) -> float:
+    return (ts - EPOCH).total_seconds()
+
+
+def from_seconds(seconds: float) -> datetime:
+    return EPOCH + timedelta(seconds=float(seconds))
+
+
+def to_datetime64(seconds: np.ndarray) -> np.ndarray:
+    """Секунды от эпохи -> datetime64[us] (удобно для matplotlib)"""
+    return (np.asarray(seconds) * 1e6).astype("datetime64[us]")
+
+
+class SampleBuffer:
+    """
+    Растущий кольцевой буфер отсчётов (ts, value) на numpy-массивах.
+
+    Таймстемпы — float64 секунды, значения — заданного dtype.
+    Отсчёты добавляются только в конец и в порядке времени
+    (порядок обеспечивает ReorderBuffer), добавление — O(1) амортизированно.
+    """
+
+    def __init__(self, dtype: DTypeLike = np.float64, capacity: int = 1024):
+        self.dtype = np.dtype(dtype)
+
+        self._ts = np.empty(capacity, dtype=np.float64)
+        self._values = np.empty(capacity, dtype=self.dtype)
+        self._start = 0
+        self._end = 0
+
+        # Сколько отсчётов было добавлено за всё время (вместе со вставленными).
+        # Абсолютная позиция отсчёта i массива: total - (_end - i)
+        self.total = 0
+
+        # Вставки не в конец: (total до вставки, абсолютная позиция) — для since()
+        self._inserts: deque[tuple[int, int]] = deque(maxlen=4096)
+
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    @property
+    def nbytes(self) -> int:
+        """Память под хранимые отсчёты (без запаса ёмкости)"""
+        return len(self) * (self._ts.itemsize + self._values.itemsize)
+
+    def _reserve(self, n: int = 1) -> None:
+        """Освобождает место под n отсчётов в конце массива"""
+        if self._end + n <= len(self._ts):
+            return
+
+        size = self._end - self._start
+        capacity = len(self._ts)
+        while size + n > capacity // 2:
+            capacity *= 2
+
+        ts = np.empty(capacity, dtype=np.float64)
+        values = np.empty(capacity, dtype=self.dtype)
+        ts[:size] = self._ts[self._start:self._end]
+        values[:size] = self._values[self._start:self._end]
+
+        self._ts, self._values = ts, values
+        self._start, self._end = 0, size
+
+    def append(self, ts: float, value) -> None:
+        with self._lock:
+            self._reserve()
+
+            self._ts[self._end] = ts
+            self._values[self._end] = value
+
+            self._end += 1
+            self.total += 1
+
+    def extend(self, ts: Sequence[float], values: Sequence) -> None:
+        """Добавление пачки упорядоченных отсчётов"""
+        n = len(ts)
+        with self._lock:
+            self._reserve(n)
+
+            end = self._end
+            self._ts[end:end + n] = ts
+            self._values[end:end + n] = values
+
+            self._end = end + n
+            self.total += n
+
+    def insert(self, ts: float, value) -> None:
+        """
+        Вставка опоздавшего отсчёта на своё место по времени.
+        Сдвигаются только более новые отсчёты — для слегка опоздавших
+        их немного.
+        """
+        with self._lock:
+            self._reserve()
+
+            end = self._end
+            i = self._start + int(np.searchsorted(self._ts[self._start:end], ts, side="right"))
+            self._ts[i + 1:end + 1] = self._ts[i:end]
+            self._values[i + 1:end + 1] = self._values[i:end]
+            self._ts[i] = ts
+            self._values[i] = value
+
+            self._inserts.append((self.total, self.total - (end - i)))
+            self._end = end + 1
+            self.total += 1
+
+    def drop_before(self, threshold: float) -> None:
+        """Удаляет отсчёты старше threshold"""
+        with self._lock:
+            self._start += int(np.searchsorted(
+                self._ts[self._start:self._end], threshold, side="left"
+            ))
+
+    def arrays(self) -> tuple[np.ndarray, np.ndarray]:
+        """Копии (ts, values), упорядоченные по времени"""
+        with self._lock:
+            s = slice(self._start, self._end)
+            return self._ts[s].copy(), self._values[s].copy()
+
+    def range(self, start: float, end: float) -> tuple[np.ndarray, np.ndarray]:
+        """Копии (ts, values) отсчётов из [start, end]"""
+        with self._lock:
+            ts = self._ts[self._start:self._end]
+            i = self._start + int(np.searchsorted(ts, start))
+            j = self._start + int(np.searchsorted(ts, end, side="right"))
+            return self._ts[i:j].copy(), self._values[i:j].copy()
+
+    @property
+    def oldest(self) -> float:
+        with self._lock:
+            if self._end == self._start:
+                return float("inf")
+            return float(self._ts[self._start])
+
+    @property
+    def complete(self) -> bool:
+        """Ничего не удалено: буфер хранит все добавленные отсчёты"""
+        with self._lock:
+            return self.total == self._end - self._start
+
+    def since(self, total: int) -> tuple[np.ndarray, np.ndarray, int]:
+        """
+        Отсчёты, добавленные после того, как счётчик total был получен
+        (не больше, чем есть в буфере), и новое значение счётчика.
+
+        Отсчёт, вставленный позже среди уже прочитанных, пропускается;
+        вставленный среди новых — возвращается вместе с ними.
+        """
+        with self._lock:
+            seen = total
+            for before, position in self._inserts:
+                if before >= total and position < seen:
+                    seen += 1
+            n = min(self.total - seen, self._end - self._start)
+            s = slice(self._end - n, self._end)
+            return self._ts[s].copy(), self._values[s].copy(), self.total
+
+    def latest(self) -> tuple[float, object] | None:
+        with self._lock:
+            if self._end == self._start:
+                return None
+            return self._ts[self._end - 1], self._values[self._end - 1]
@@ -14,8 +14,10 @@ class SerialSource(SignalSource):
             baudrate: int = 9600,
             livetime: timedelta = timedelta(seconds=5),
             interval: float = 1.0,
+            history: timedelta | None = None,
+            lateness: timedelta = timedelta(0),
     ):
-        super().__init__(livetime=livetime, title="SerialSource")
+        super().__init__(livetime=livetime, title="SerialSource", history=history, lateness=lateness)
 
         self.port = port
         self.data_extractor = data_extractor
@@ -0,0 +1,140 @@
+import os
+from datetime import datetime, timedelta
+from typing import Sequence
+
+import numpy as np
+from numpy.typing import DTypeLike
+
+from filters.bank import FilterBank
+from filters.base import FilterBase
+from filters.state import Checkpointer
+from signal_sources.base import SignalSource
+
+
+class DerivedSource(SignalSource):
+    """
+    Канал, значения которого вычисляются из другого источника.
+    Сам ничего не читает — данные поступают через feed().
+    """
+
+    def __init__(
+            self,
+            livetime: timedelta = timedelta(seconds=5),
+            title: str = "Derived Signal",
+            dtype: DTypeLike = np.float64,
+            history: timedelta | None = None,
+            lateness: timedelta = timedelta(0),
+    ):
+        super().__init__(
+            livetime=livetime, title=title, dtype=dtype, history=history, lateness=lateness
+        )
+
+    def feed(self, value: float, ts: datetime | None = None):
+        self._append(value, ts)
+
+    def feed_many(self, values: Sequence[float], ts: Sequence[datetime]):
+        self._extend(values, ts)
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+
+def _checkpointer(
+        filter_: FilterBase,
+        checkpoint: str | os.PathLike | None,
+        interval: timedelta,
+) -> Checkpointer | None:
+    """Checkpointer для живого канала; состояние сразу восстанавливается из снимка"""
+    if checkpoint is None:
+        return None
+
+    # Запись на диск — в фоне: слушатель может работать в callback аудио
+    checkpointer = Checkpointer(filter_, checkpoint, interval, background=True)
+    checkpointer.restore()
+    return checkpointer
+
+
+def filter_channel(
+        source: SignalSource,
+        filter_: FilterBase,
+        title: str | None = None,
+        component: int = 0,
+        checkpoint: str | os.PathLike | None = None,
+        checkpoint_interval: timedelta = timedelta(seconds=10),
+) -> DerivedSource:
+    """
+    Подключает фильтр к источнику: каждое новое значение прогоняется
+    одним шагом фильтра, оценка попадает в возвращаемый канал.
+
+    :param source: исходный источник
+    :param filter_: фильтр
+    :param title: подпись канала (по умолчанию "Фильтрированный <источник>")
+    :param component: компонента вектора состояния, выводимая в канал
+    :param checkpoint: файл снимка состояния фильтра: при подключении
+        фильтр восстанавливается из него, затем сохраняется не чаще
+        checkpoint_interval (после очередного отсчёта)
+    :param checkpoint_interval: период сохранения снимка
+    """
+    channel = DerivedSource(
+        livetime=source.livetime,
+        title=title or f"Фильтрированный {source.title}",
+        dtype=filter_.dtype,
+    )
+    checkpointer = _checkpointer(filter_, checkpoint, checkpoint_interval)
+
+    def on_value(value: float, ts: datetime):
+        estimate = filter_.one_step(value)
+        channel.feed(float(np.reshape(estimate, -1)[component]), ts)
+        if checkpointer is not None:
+            checkpointer.tick()
+
+    source.subscribe(on_value)
+    return channel
+
+
+def bank_channels(
+        source: SignalSource,
+        bank: FilterBank,
+        titles: Sequence[str] | None = None,
+        component: int = 0,
+        checkpoint: str | os.PathLike | None = None,
+        checkpoint_interval: timedelta = timedelta(seconds=10),
+) -> list[DerivedSource]:
+    """
+    Подключает банк фильтров к источнику.
+
+    Каждое новое значение источника прогоняется одним шагом банка,
+    а оценка каждого фильтра попадает в свой канал.
+
+    :param source: исходный источник
+    :param bank: банк фильтров
+    :param titles: подписи каналов (по умолчанию "<источник> #k")
+    :param component: компонента вектора состояния, выводимая в канал
+    :param checkpoint: файл снимка состояния банка (см. filter_channel)
+    :param checkpoint_interval: период сохранения снимка
+    :return: список каналов, по одному на фильтр банка
+    """
+    if titles is None:
+        titles = [f"{source.title} #{k}" for k in range(len(bank))]
+
+    if len(titles) != len(bank):
+        raise ValueError(f"Expected {len(bank)} titles, got {len(titles)}")
+
+    channels = [
+        DerivedSource(livetime=source.livetime, title=title, dtype=bank.dtype)
+        for title in titles
+    ]
+    checkpointer = _checkpointer(bank, checkpoint, checkpoint_interval)
+
+    def on_value(value: float, ts: datetime):
+        estimates = bank.one_step(value)
+        for channel, estimate in zip(channels, estimates[:, component, 0]):
+            channel.feed(float(estimate), ts)
+        if checkpointer is not None:
+            checkpointer.tick()
+
+    source.subscribe(on_value)
+    return channels
@@ -12,8 +12,10 @@ class GeneratedSource(SignalSource):
             interval: float = 0.05,
             livetime: timedelta = timedelta(seconds=5),
             title: str = "Generated Signal",
+            history: timedelta | None = None,
+            lateness: timedelta = timedelta(0),
     ):
-        super().__init__(livetime=livetime, title=title)
+        super().__init__(livetime=livetime, title=title, history=history, lateness=lateness)
 
         self.interval = interval
         self.func = func
@@ -17,8 +17,15 @@ class ApiSource(SignalSource):
         interval: float = 1.0,
         timeout: float = 5.0,
         headers: Optional[dict] = None,
+        history: timedelta | None = None,
+        lateness: timedelta = timedelta(seconds=1),
     ):
-        super().__init__(livetime=livetime, title="ApiSource")
+        """
+        :param lateness: таймстемп снимается до запроса, поэтому отсчёты
+            других производителей могут его обогнать; по умолчанию
+            окно переупорядочивания — 1 с (типичная задержка ответа)
+        """
+        super().__init__(livetime=livetime, title="ApiSource", history=history, lateness=lateness)
 
         self.url = url
         self.data_extractor = data_extractor
@@ -12,10 +12,15 @@ class MicrophoneSource(SignalSource):
         samplerate=44100,
         blocksize=1024,
         gain=1.0,
-        livetime: timedelta = timedelta(seconds=5)
+        livetime: timedelta = timedelta(seconds=5),
+        dtype=np.float32,
+        history: timedelta | None = None,
+        lateness: timedelta = timedelta(0),
     ):
         device_name = sd.query_devices(device)["name"]
-        super().__init__(livetime=livetime, title=device_name)
+        super().__init__(
+            livetime=livetime, title=device_name, dtype=dtype, history=history, lateness=lateness
+        )
 
         self.device = device
         self.samplerate = samplerate
@@ -45,6 +50,7 @@ class MicrophoneSource(SignalSource):
             samplerate=self.samplerate,
             blocksize=self.blocksize,
             channels=1,
+            dtype="float32",
             callback=self._callback,
         )
         self.stream.start()
@@ -0,0 +1,514 @@
+import math
+import multiprocessing as mp
+import threading
+import time
+import traceback
+from datetime import timedelta
+from multiprocessing.connection import Connection
+from multiprocessing.shared_memory import SharedMemory
+from typing import Callable
+
+import numpy as np
+from numpy.typing import DTypeLike
+
+from signal_sources.base import SignalSource
+from signal_sources.buffer import SampleBuffer, from_seconds, to_seconds
+
+# Заголовок кольца (int64):
+# [всего записано, heartbeat (нс, monotonic), pid, флаг остановки, источник запущен, резерв...]
+_HEADER = 8
+_TOTAL, _HEARTBEAT, _PID, _STOP, _READY = 0, 1, 2, 3, 4
+
+
+class SharedRing:
+    """
+    Кольцевой буфер отсчётов (ts, value) фиксированного размера
+    в multiprocessing.shared_memory.
+
+    Пишет ровно один процесс; читатели получают согласованные копии
+    без блокировок: после копирования заново читается счётчик записей
+    и отбрасываются ячейки, которые за это время могли быть перезаписаны.
+
+    Интерфейс чтения совпадает с SampleBuffer, поэтому кольцо
+    может служить буфером SignalSource в родительском процессе.
+    """
+
+    def __init__(self, shm: SharedMemory, capacity: int, dtype: DTypeLike):
+        self.dtype = np.dtype(dtype)
+        self.capacity = capacity
+        self._shm = shm
+
+        offset = 0
+        self._header = np.ndarray((_HEADER,), dtype=np.int64, buffer=shm.buf, offset=offset)
+        offset += self._header.nbytes
+        self._ts = np.ndarray((capacity,), dtype=np.float64, buffer=shm.buf, offset=offset)
+        offset += self._ts.nbytes
+        self._values = np.ndarray((capacity,), dtype=self.dtype, buffer=shm.buf, offset=offset)
+
+        # Нижняя граница по времени для читателя (аналог drop_before)
+        self._floor = float("-inf")
+
+    @staticmethod
+    def _size(capacity: int, dtype: np.dtype) -> int:
+        return _HEADER * 8 + capacity * (8 + dtype.itemsize)
+
+    @classmethod
+    def create(cls, capacity: int, dtype: DTypeLike = np.float64) -> "SharedRing":
+        dtype = np.dtype(dtype)
+        shm = SharedMemory(create=True, size=cls._size(capacity, dtype))
+        ring = cls(shm, capacity, dtype)
+        ring._header[:] = 0
+        return ring
+
+    @classmethod
+    def attach(cls, name: str, capacity: int, dtype: DTypeLike = np.float64) -> "SharedRing":
+        # track=False: за удаление отвечает создатель, а не дочерний процесс
+        return cls(SharedMemory(name=name, track=False), capacity, dtype)
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    @property
+    def total(self) -> int:
+        return int(self._header[_TOTAL])
+
+    @property
+    def heartbeat(self) -> int:
+        return int(self._header[_HEARTBEAT])
+
+    def beat(self) -> None:
+        self._header[_HEARTBEAT] = time.monotonic_ns()
+
+    @property
+    def ready(self) -> bool:
+        """Дочерний процесс запустил источник и шлёт heartbeat"""
+        return bool(self._header[_READY])
+
+    @ready.setter
+    def ready(self, value: bool) -> None:
+        self._header[_READY] = int(value)
+
+    @property
+    def stopping(self) -> bool:
+        return bool(self._header[_STOP])
+
+    @stopping.setter
+    def stopping(self, value: bool) -> None:
+        # Флаг в общей памяти, а не mp.Event: убитый процесс
+        # не может оставить его заблокированным
+        self._header[_STOP] = int(value)
+
+    def append(self, ts: float, value) -> None:
+        total = int(self._header[_TOTAL])
+        i = total % self.capacity
+        self._ts[i] = ts
+        self._values[i] = value
+        # Счётчик — после данных: читатель не увидит недописанную ячейку
+        self._header[_TOTAL] = total + 1
+
+    def views(self, total: int | None = None) -> list[tuple[np.ndarray, np.ndarray]]:
+        """
+        Участки кольца без копирования, в порядке времени.
+        Могут быть перезаписаны писателем во время чтения.
+        """
+        if total is None:
+            total = self.total
+        n = min(total, self.capacity)
+        start = (total - n) % self.capacity
+        end = start + n
+
+        if end <= self.capacity:
+            return [(self._ts[start:end], self._values[start:end])]
+        end -= self.capacity
+        return [
+            (self._ts[start:], self._values[start:]),
+            (self._ts[:end], self._values[:end]),
+        ]
+
+    def _search(self, value: float, total: int, side: str = "left") -> int:
+        """
+        Номер записи (по счётчику total), на которой value встал бы
+        в упорядоченные по времени данные: поиск в участках без копирования
+        """
+        position = total - min(total, self.capacity)
+        for ts, _ in self.views(total):
+            i = int(np.searchsorted(ts, value, side=side))
+            if i < len(ts):
+                return position + i
+            position += len(ts)
+        return position
+
+    def _first(self, total: int) -> int:
+        """
+        Номер самой старой читаемой записи. Ячейка, которую писатель
+        перезапишет следующей, не читается
+        """
+        return max(total - self.capacity + 1, self._search(self._floor, total), 0)
+
+    def _copy(self, start: int, end: int) -> tuple[np.ndarray, np.ndarray]:
+        """Копии записей [start, end) — только этот участок кольца"""
+        n = max(end - start, 0)
+        i = start % self.capacity
+        if i + n <= self.capacity:
+            ts, values = self._ts[i:i + n].copy(), self._values[i:i + n].copy()
+        else:
+            k = self.capacity - i
+            ts = np.concatenate((self._ts[i:], self._ts[:n - k]))
+            values = np.concatenate((self._values[i:], self._values[:n - k]))
+
+        # Ячейки, которые писатель мог перезаписать, пока мы копировали
+        overwritten = self.total - self.capacity + 1 - start
+        if overwritten > 0:
+            ts, values = ts[overwritten:], values[overwritten:]
+        return ts, values
+
+    def arrays(self) -> tuple[np.ndarray, np.ndarray]:
+        total = self.total
+        return self._copy(self._first(total), total)
+
+    def since(self, total: int) -> tuple[np.ndarray, np.ndarray, int]:
+        current = self.total
+        ts, values = self._copy(max(total, self._first(current)), current)
+        return ts, values, current
+
+    def __len__(self) -> int:
+        total = self.total
+        return total - self._first(total)
+
+    @property
+    def complete(self) -> bool:
+        return self._first(self.total) == 0
+
+    def drop_before(self, threshold: float) -> None:
+        self._floor = threshold
+
+    def range(self, start: float, end: float) -> tuple[np.ndarray, np.ndarray]:
+        total = self.total
+        i = max(self._first(total), self._search(start, total))
+        j = self._search(end, total, side="right")
+        return self._copy(i, j)
+
+    @property
+    def oldest(self) -> float:
+        total = self.total
+        i = self._first(total)
+        return float(self._ts[i % self.capacity]) if i < total else float("inf")
+
+    def latest(self) -> tuple[float, object] | None:
+        total = self.total
+        if total == 0:
+            return None
+        i = (total - 1) % self.capacity
+        if self._ts[i] < self._floor:
+            return None
+        return self._ts[i], self._values[i]
+
+    def close(self) -> None:
+        # Представления держат ссылку на буфер — их нужно отпустить до close()
+        self._header = self._ts = self._values = None
+        self._shm.close()
+
+    def unlink(self) -> None:
+        self._shm.unlink()
+
+
+def _child_main(
+        factory: Callable[[], SignalSource],
+        name: str,
+        capacity: int,
+        dtype: np.dtype,
+        heartbeat: float,
+        errors: Connection,
+):
+    """
+    Точка входа дочернего процесса: источник пишет в общее кольцо.
+    Ошибка запуска источника передаётся родителю через errors
+    """
+    ring = SharedRing.attach(name, capacity, dtype)
+    ring._header[_PID] = mp.current_process().pid
+    ring.beat()
+
+    try:
+        source = factory()
+        source.subscribe(lambda value, ts: ring.append(to_seconds(ts), value))
+        source.start()
+    except Exception:
+        errors.send(traceback.format_exc())
+        ring.close()
+        return
+    ring.ready = True
+
+    try:
+        while not ring.stopping:
+            ring.beat()
+            time.sleep(heartbeat)
+    finally:
+        source.stop()
+        ring.close()
+
+
+class ProcessSource(SignalSource):
+    """
+    Источник, работающий в отдельном процессе.
+
+    Чтение COM-порта, звука или опрос API не конкурируют за GIL
+    с графиками и фильтрами: дочерний процесс пишет отсчёты в кольцо
+    в общей памяти, а этот объект читает его с тем же API
+    (get_buffer / get_values / get_latest / get_range).
+
+    Если дочерний процесс упал или перестал отправлять heartbeat,
+    он перезапускается с растущей паузой (restart_delay, 2 * restart_delay, ...
+    до max_restart_delay). После max_restarts неудачных запусков подряд
+    попытки прекращаются. Ошибка запуска источника в дочернем процессе
+    печатается и сохраняется в error. Пока источник в нём запускается
+    (spawn, импорты, factory(), start()), вместо heartbeat_timeout
+    действует startup_timeout.
+
+    Кольцо фиксированного размера: при rate (отсчётов в секунду)
+    его размер по умолчанию рассчитывается на livetime с запасом.
+    Если кольцо всё же хранит меньше livetime, выводится предупреждение.
+
+    factory должна быть picklable (функция модуля, functools.partial):
+        ProcessSource(partial(SerialSource, "COM6", parse_a0, interval=0.001))
+
+    Новые отсчёты кольца раз в poll секунд передаются подписчикам
+    (subscribe) и агрегатам (history) в родительском процессе.
+    Порядок отсчётов обеспечивает источник в дочернем процессе:
+    lateness передаётся через factory (partial(ApiSource, ..., lateness=...)).
+    """
+
+    def __init__(
+            self,
+            factory: Callable[[], SignalSource],
+            livetime: timedelta = timedelta(seconds=5),
+            title: str = "ProcessSource",
+            dtype: DTypeLike = np.float64,
+            capacity: int | None = None,
+            rate: float | None = None,
+            history: timedelta | None = None,
+            poll: float = 0.02,
+            heartbeat: float = 0.2,
+            heartbeat_timeout: float = 2.0,
+            startup_timeout: float = 30.0,
+            restart_delay: float = 0.5,
+            max_restart_delay: float = 30.0,
+            max_restarts: int | None = 10,
+    ):
+        """
+        :param capacity: размер кольца в отсчётах; по умолчанию
+            livetime * rate * 1.5 или 65536, если rate не задан
+        :param rate: ожидаемая частота отсчётов, Гц
+        :param history: сколько хранить агрегаты (см. SignalSource)
+        :param poll: период передачи новых отсчётов подписчикам, с
+        :param restart_delay: пауза перед первым перезапуском, с;
+            удваивается с каждой неудачей подряд до max_restart_delay
+        :param max_restarts: сколько перезапусков подряд без успешного
+            запуска источника допускается; None — без ограничения
+        """
+        super().__init__(livetime=livetime, title=title, dtype=dtype, history=history)
+
+        if capacity is None:
+            capacity = math.ceil(livetime.total_seconds() * rate * 1.5) if rate else 1 << 16
+
+        self.factory = factory
+        self.capacity = capacity
+        self.poll = poll
+        self.heartbeat = heartbeat
+        self.heartbeat_timeout = heartbeat_timeout
+        self.startup_timeout = startup_timeout
+        self.restart_delay = restart_delay
+        self.max_restart_delay = max_restart_delay
+        self.max_restarts = max_restarts
+
+        # Сколько раз дочерний процесс перезапускался
+        self.restarts = 0
+        # Последняя ошибка запуска источника в дочернем процессе
+        self.error: str | None = None
+        # Отсчёты, перезаписанные в кольце до передачи подписчикам
+        self.missed = 0
+
+        self._ctx = mp.get_context("spawn")
+        self._ring: SharedRing | None = None
+        self._process: mp.Process | None = None
+        self._errors: tuple[Connection, Connection] | None = None
+        self._monitor: threading.Thread | None = None
+        self._reader: threading.Thread | None = None
+        self._running = False
+        self._stopped = threading.Event()
+        self._spawned_at = 0.0
+        self._failures = 0
+        self._seen = 0
+        self._warned_short = False
+
+    def get_views(self) -> list[tuple[np.ndarray, np.ndarray]]:
+        """
+        Данные кольца без копирования: список участков (ts, values)
+        в порядке времени. Не учитывает livetime.
+        """
+        if self._ring is None:
+            return []
+        return self._ring.views()
+
+    def _spawn(self):
+        self._ring.stopping = False
+        self._ring.ready = False
+        self._process = self._ctx.Process(
+            target=_child_main,
+            args=(
+                self.factory,
+                self._ring.name,
+                self.capacity,
+                self._ring.dtype,
+                self.heartbeat,
+                self._errors[1],
+            ),
+            daemon=True,
+        )
+        # Время запуска считается первым heartbeat
+        self._ring.beat()
+        self._spawned_at = time.monotonic()
+        self._process.start()
+
+    def _kill(self):
+        self._ring.stopping = True
+        if self._process is not None:
+            self._process.join(timeout=1.0)
+            if self._process.is_alive():
+                self._process.kill()
+                self._process.join()
+        self._process = None
+
+    def _responding(self) -> bool:
+        if not self._process.is_alive():
+            return False
+
+        if not self._ring.ready:
+            return time.monotonic() - self._spawned_at < self.startup_timeout
+
+        silence = (time.monotonic_ns() - self._ring.heartbeat) / 1e9
+        return silence < self.heartbeat_timeout
+
+    def _check_errors(self):
+        """Ошибки запуска, присланные дочерним процессом"""
+        receiver = self._errors[0]
+        while receiver.poll():
+            self.error = receiver.recv()
+            print(f"{self.title}: child process failed to start source:\n{self.error}")
+
+    def _check_capacity(self):
+        """Предупреждение, если кольцо хранит меньше livetime"""
+        if self._warned_short or self._ring.total <= self.capacity:
+            return
+
+        latest = self._ring.latest()
+        if latest is None:
+            return
+
+        kept = latest[0] - self._ring.oldest
+        if kept < 0.9 * self.livetime.total_seconds():
+            self._warned_short = True
+            print(
+                f"{self.title}: ring of {self.capacity} samples holds only {kept:.1f} s "
+                f"of livetime {self.livetime.total_seconds():.1f} s, increase capacity or rate"
+            )
+
+    def _monitor_loop(self):
+        # Ожидание через Event: stop() будит монитор сразу
+        while not self._stopped.wait(self.heartbeat):
+            self._check_capacity()
+            self._check_errors()
+            if self._responding():
+                if self._ring.ready:
+                    self._failures = 0
+                continue
+
+            self._kill()
+            self._check_errors()
+            if self.max_restarts is not None and self._failures >= self.max_restarts:
+                print(f"{self.title}: child process failed {self._failures} times in a row, giving up")
+                break
+
+            delay = min(self.restart_delay * 2 ** self._failures, self.max_restart_delay)
+            print(f"{self.title}: child process is not responding, restarting in {delay:.1f} s")
+            self._failures += 1
+            if self._stopped.wait(delay):
+                break
+            self.restarts += 1
+            self._spawn()
+
+    def _dispatch(self):
+        """Новые отсчёты кольца — агрегатам и подписчикам"""
+        previous = self._seen
+        seconds, values, self._seen = self._ring.since(previous)
+
+        missed = self._seen - previous - len(seconds)
+        if missed > 0:
+            if not self.missed:
+                print(f"{self.title}: ring overwritten before listeners got {missed} samples")
+            self.missed += missed
+
+        if not len(seconds) or not (self._tiers or self._listeners):
+            return
+
+        with self._ingest_lock:
+            for t, value in zip(seconds.tolist(), values.tolist()):
+                for tier in self._tiers:
+                    tier.add(t, value)
+
+                if self._listeners:
+                    ts = from_seconds(t)
+                    for listener in self._listeners:
+                        listener(value, ts)
+
+    def _reader_loop(self):
+        while not self._stopped.wait(self.poll):
+            self._dispatch()
+
+    def start(self):
+        if self._running:
+            return
+
+        self._ring = SharedRing.create(self.capacity, self.dtype)
+        self._buffer = self._ring
+        self._errors = self._ctx.Pipe(duplex=False)
+
+        self._running = True
+        self._stopped.clear()
+        self._failures = 0
+        self._seen = 0
+        self._spawn()
+
+        self._monitor = threading.Thread(target=self._monitor_loop, daemon=True)
+        self._monitor.start()
+        self._reader = threading.Thread(target=self._reader_loop, daemon=True)
+        self._reader.start()
+
+    def stop(self):
+        if not self._running:
+            return
+
+        self._running = False
+        self._stopped.set()
+        # Без таймаута: монитор может быть в середине перезапуска,
+        # кольцо нельзя освобождать, пока потоки не вышли
+        for thread in (self._monitor, self._reader):
+            if thread:
+                thread.join()
+        self._monitor = self._reader = None
+
+        self._kill()
+        self._dispatch()
+
+        # Последние данные остаются доступны в обычном буфере
+        ts, values = self._ring.arrays()
+        self._buffer = SampleBuffer(self._ring.dtype)
+        self._buffer.extend(ts, values)
+
+        for connection in self._errors:
+            connection.close()
+        self._errors = None
+
+        self._ring.close()
+        self._ring.unlink()
+        self._ring = None
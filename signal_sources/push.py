@@ -0,0 +1,296 @@
+import asyncio
+import socket
+import struct
+import threading
+from datetime import datetime, timedelta
+from typing import Sequence
+
+import numpy as np
+
+from signal_sources.derived import DerivedSource
+
+# Поля платы esp8266 в порядке вывода (см. esp8266/sensor_docs.md)
+ESP_FIELDS = ("temperature", "pressure", "altitude", "sea_level", "real_altitude", "a0")
+
+# Бинарный кадр:
+#   magic "MF", число полей, длина id, число отсчётов, период отсчётов (мкс),
+#   затем id устройства (utf-8) и отсчёты float32 (n_samples × n_fields)
+BINARY_MAGIC = b"MF"
+BINARY_HEADER = struct.Struct("<2sBBHI")
+
+# millis() платы — uint32, переполняется примерно раз в 49 суток
+MILLIS_WRAP = 1 << 32
+
+
+def encode_line_frame(
+        device: str,
+        samples: Sequence[Sequence[float]],
+        period: timedelta | None = None,
+        millis: int = 0,
+) -> bytes:
+    """
+    Текстовый кадр: по строке "!<id>;v1;v2;..." на отсчёт.
+    С period строки получают метку "!<id>@<мс>;..." как у платы
+    (millis — метка первого отсчёта)
+    """
+    def prefix(i: int) -> str:
+        if period is None:
+            return f"!{device};"
+        ms = (millis + round(i * period.total_seconds() * 1000)) % MILLIS_WRAP
+        return f"!{device}@{ms};"
+
+    return "".join(
+        prefix(i) + ";".join(str(v) for v in sample) + "\n"
+        for i, sample in enumerate(samples)
+    ).encode()
+
+
+def encode_binary_frame(
+        device: str,
+        samples: np.ndarray,
+        period: timedelta = timedelta(0),
+) -> bytes:
+    """Бинарный кадр из массива отсчётов (n_samples, n_fields)"""
+    samples = np.asarray(samples, dtype="<f4")
+    device_id = device.encode()
+    header = BINARY_HEADER.pack(
+        BINARY_MAGIC,
+        samples.shape[1],
+        len(device_id),
+        samples.shape[0],
+        int(period.total_seconds() * 1e6),
+    )
+    return header + device_id + samples.tobytes()
+
+
+class _Protocol(asyncio.DatagramProtocol):
+    def __init__(self, receiver: "UdpReceiver"):
+        self.receiver = receiver
+
+    def datagram_received(self, data: bytes, addr):
+        self.receiver._handle(data, datetime.now())
+
+
+class UdpReceiver:
+    """
+    Приёмник данных, которые платы сами отправляют по UDP.
+
+    Вместо опроса каждой платы по HTTP (ApiSource) один event loop
+    принимает кадры от многих плат и раскладывает их по каналам
+    (устройство, поле). Каждый канал — обычный источник для plot_signals.
+
+    Поддерживаются два формата кадра (в одной датаграмме может быть
+    несколько отсчётов):
+        - текстовый: строки "!<id>@<millis>;v1;v2;..." как в COM-порте,
+          но с id платы и временем платы в мс (метка "@millis" необязательна)
+        - бинарный: см. encode_binary_frame
+
+    Последний отсчёт устройства в датаграмме получает время приёма,
+    остальные сдвигаются назад по меткам платы (или по периоду
+    бинарного кадра).
+
+    Пример:
+        receiver = UdpReceiver(port=4210)
+        a0 = receiver.channel("esp-1", "a0")
+        receiver.start()
+        plot_signals(a0)
+    """
+
+    def __init__(
+            self,
+            host: str = "0.0.0.0",
+            port: int = 4210,
+            fields: Sequence[str] = ESP_FIELDS,
+            livetime: timedelta = timedelta(seconds=5),
+            history: timedelta | None = None,
+            lateness: timedelta = timedelta(milliseconds=200),
+            recv_buffer: int = 1 << 22,
+    ):
+        """
+        :param lateness: окно переупорядочивания каналов: отсчёты пачки
+            датируются задним числом, и при задержках в сети пачки
+            одного устройства могут перекрываться по времени
+        :param recv_buffer: размер приёмного буфера сокета (SO_RCVBUF), байт:
+            со стандартным буфер переполняется при всплесках датаграмм
+            (в Linux ограничен net.core.rmem_max)
+        """
+        self.host = host
+        self.port = port
+        self.recv_buffer = recv_buffer
+        self.fields = tuple(fields)
+        self.livetime = livetime
+        self.history = history
+        self.lateness = lateness
+
+        self._channels: dict[tuple[str, str], DerivedSource] = {}
+        self._lock = threading.Lock()
+
+        # Принятые кадры и кадры (или строки кадра), которые не удалось разобрать
+        self.frames = 0
+        self.bad_frames = 0
+
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._transport: asyncio.DatagramTransport | None = None
+        self._thread: threading.Thread | None = None
+        self._ready = threading.Event()
+
+    @property
+    def devices(self) -> list[str]:
+        """Устройства, от которых были данные или запрошены каналы"""
+        return sorted({device for device, _ in self._channels})
+
+    @property
+    def address(self) -> tuple[str, int] | None:
+        """Фактический адрес сокета (полезно при port=0)"""
+        if self._transport is None:
+            return None
+        return self._transport.get_extra_info("sockname")[:2]
+
+    def channel(self, device: str, field: str) -> DerivedSource:
+        """Канал (устройство, поле); создаётся при первом обращении"""
+        if field not in self.fields:
+            raise ValueError(f"Unknown field '{field}', expected one of {self.fields}")
+
+        key = (device, field)
+        with self._lock:
+            channel = self._channels.get(key)
+            if channel is None:
+                channel = DerivedSource(
+                    livetime=self.livetime,
+                    title=f"{device} {field}",
+                    history=self.history,
+                    lateness=self.lateness,
+                )
+                self._channels[key] = channel
+            return channel
+
+    def _feed(self, device: str, samples: Sequence[Sequence[float]], ts: Sequence[datetime]):
+        """Раскладывает отсчёты (n_samples × n_fields) по каналам устройства"""
+        if not samples:
+            return
+
+        for field, column in zip(self.fields, zip(*samples)):
+            self.channel(device, field).feed_many(column, ts)
+
+    def _handle(self, data: bytes, ts: datetime):
+        try:
+            if data.startswith(BINARY_MAGIC):
+                self._handle_binary(data, ts)
+            else:
+                self._handle_lines(data, ts)
+        except (ValueError, struct.error, UnicodeDecodeError) as e:
+            self.bad_frames += 1
+            print(f"UDP frame error: '{e}' on frame {data[:64]!r}")
+            return
+
+        self.frames += 1
+
+    def _handle_lines(self, data: bytes, ts: datetime):
+        by_device: dict[str, tuple[list[list[float]], list[int | None]]] = {}
+
+        for line in data.decode().splitlines():
+            if not line.startswith("!"):
+                continue
+
+            head, *values = line[1:].split(";")
+            device, _, millis = head.partition("@")
+
+            # Строка с неверным числом полей отбрасывается, остальные принимаются
+            if len(values) != len(self.fields):
+                self.bad_frames += 1
+                print(f"UDP line error: expected {len(self.fields)} fields, got {len(values)} in {line[:64]!r}")
+                continue
+
+            samples, marks = by_device.setdefault(device, ([], []))
+            samples.append([float(v) for v in values])
+            marks.append(int(millis) if millis else None)
+
+        if not by_device:
+            raise ValueError("no samples in frame")
+
+        for device, (samples, marks) in by_device.items():
+            last = marks[-1]
+            if last is None or None in marks:
+                # Старый формат без меток: время приёма для всех строк
+                timestamps = [ts] * len(samples)
+            else:
+                timestamps = [
+                    ts - timedelta(milliseconds=(last - mark) % MILLIS_WRAP)
+                    for mark in marks
+                ]
+            self._feed(device, samples, timestamps)
+
+    def _handle_binary(self, data: bytes, ts: datetime):
+        _, n_fields, id_len, n_samples, period_us = BINARY_HEADER.unpack_from(data)
+        if n_fields != len(self.fields):
+            raise ValueError(f"expected {len(self.fields)} fields, got {n_fields}")
+        if n_samples == 0:
+            raise ValueError("no samples in frame")
+
+        offset = BINARY_HEADER.size
+        device = data[offset:offset + id_len].decode()
+        offset += id_len
+
+        samples = np.frombuffer(
+            data, dtype="<f4", count=n_samples * n_fields, offset=offset
+        ).reshape(n_samples, n_fields)
+
+        # Последний отсчёт кадра — момент приёма, остальные раньше на период
+        period = timedelta(microseconds=period_us)
+        timestamps = [ts - period * (n_samples - 1 - i) for i in range(n_samples)]
+        self._feed(device, samples.tolist(), timestamps)
+
+    def _run_loop(self):
+        """
+        Отдельный поток с собственным event loop.
+        """
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+
+        try:
+            self._transport, _ = self._loop.run_until_complete(
+                self._loop.create_datagram_endpoint(
+                    lambda: _Protocol(self),
+                    local_addr=(self.host, self.port),
+                )
+            )
+        except OSError as e:
+            print(f"UDP bind error: {e}")
+            self._ready.set()
+            self._loop.close()
+            return
+
+        sock = self._transport.get_extra_info("socket")
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, self.recv_buffer)
+        except OSError as e:
+            print(f"UDP SO_RCVBUF error: {e}")
+
+        self._ready.set()
+        try:
+            self._loop.run_forever()
+        finally:
+            self._transport.close()
+            self._loop.run_until_complete(asyncio.sleep(0))
+            self._loop.close()
+
+    def start(self):
+        if self._thread is not None:
+            return
+
+        self._ready.clear()
+        self._thread = threading.Thread(target=self._run_loop, daemon=True)
+        self._thread.start()
+        self._ready.wait(timeout=2.0)
+
+    def stop(self):
+        if self._thread is None:
+            return
+
+        if self._loop and self._loop.is_running():
+            self._loop.call_soon_threadsafe(self._loop.stop)
+
+        self._thread.join(timeout=2.0)
+        self._thread = None
+        self._loop = None
+        self._transport = None
@@ -0,0 +1,87 @@
+import heapq
+import itertools
+import threading
+from datetime import timedelta
+
+
+class ReorderBuffer:
+    """
+    Окно переупорядочивания отсчётов с водяным знаком (watermark).
+
+    Отсчёты могут приходить с небольшим опозданием (таймстемп снят
+    до запроса, несколько потоков-производителей). Они копятся в
+    небольшой куче и выпускаются по порядку, как только watermark
+    (максимальный увиденный таймстемп минус lateness) их прошёл.
+
+    Отсчёт старше уже выпущенных по порядку выпустить нельзя: push
+    его не принимает, и вызывающий решает, что с ним делать
+    (SignalSource вставляет его в буфер на своё место).
+    При lateness = 0 упорядоченные отсчёты проходят без задержки.
+    """
+
+    def __init__(self, lateness: timedelta = timedelta(0), max_pending: int = 1024):
+        self.lateness = lateness.total_seconds()
+        self.max_pending = max_pending
+
+        self._heap: list[tuple[float, int, object]] = []
+        self._seq = itertools.count()
+        self._max_seen = float("-inf")
+        self._released = float("-inf")
+        self._lock = threading.Lock()
+
+        # Пришли не по порядку, но успели встать на своё место
+        self.late = 0
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    @property
+    def watermark(self) -> float:
+        return self._max_seen - self.lateness
+
+    def push(self, ts: float, value) -> list[tuple[float, object]] | None:
+        """
+        Принять отсчёт.
+
+        Returns:
+            отсчёты, которые можно выпускать, в порядке времени;
+            None, если отсчёт старше уже выпущенных и не принят
+        """
+        with self._lock:
+            if ts < self._released:
+                return None
+
+            if ts < self._max_seen:
+                self.late += 1
+            else:
+                self._max_seen = ts
+
+            # Быстрый путь: нечего ждать
+            if not self._heap and ts <= self.watermark:
+                self._released = ts
+                return [(ts, value)]
+
+            heapq.heappush(self._heap, (ts, next(self._seq), value))
+            return self._release(self.watermark)
+
+    def advance(self, now: float) -> list[tuple[float, object]]:
+        """
+        Продвинуть watermark по текущему времени: если новых отсчётов нет,
+        ожидающие всё равно выпускаются через lateness.
+        """
+        with self._lock:
+            if not self._heap:
+                return []
+            return self._release(max(self.watermark, now - self.lateness))
+
+    def _release(self, watermark: float) -> list[tuple[float, object]]:
+        released = []
+        heap = self._heap
+
+        while heap and (heap[0][0] <= watermark or len(heap) > self.max_pending):
+            ts, _, value = heapq.heappop(heap)
+            released.append((ts, value))
+
+        if released:
+            self._released = released[-1][0]
+        return released
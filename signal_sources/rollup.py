@@ -0,0 +1,195 @@
+import math
+import threading
+from datetime import timedelta
+
+import numpy as np
+from numpy.typing import DTypeLike
+
+# Разрешение уровня -> сколько его хранить (None — вся история)
+DEFAULT_TIERS: tuple[tuple[timedelta, timedelta | None], ...] = (
+    (timedelta(milliseconds=10), timedelta(minutes=2)),
+    (timedelta(seconds=1), timedelta(hours=2)),
+    (timedelta(minutes=1), None),
+)
+
+
+def default_tiers(history: timedelta, dtype: DTypeLike = np.float64) -> list["RollupTier"]:
+    """Уровни по умолчанию (10 мс, 1 с, 1 мин), не длиннее history"""
+    return [
+        RollupTier(resolution, min(retention or history, history), dtype)
+        for resolution, retention in DEFAULT_TIERS
+        if resolution < history
+    ]
+
+
+class RollupTier:
+    """
+    Уровень агрегатов фиксированного разрешения.
+
+    Для каждого интервала длиной resolution хранит min/max/mean и количество
+    отсчётов в кольцевом буфере фиксированного размера (retention / resolution).
+    Обновляется инкрементально при каждом добавлении отсчёта.
+    """
+
+    def __init__(
+            self,
+            resolution: timedelta,
+            retention: timedelta,
+            dtype: DTypeLike = np.float64,
+    ):
+        self.resolution = resolution.total_seconds()
+        self.retention = retention.total_seconds()
+
+        capacity = max(1, math.ceil(self.retention / self.resolution))
+        self._ts = np.zeros(capacity, dtype=np.float64)
+        self._min = np.zeros(capacity, dtype=dtype)
+        self._max = np.zeros(capacity, dtype=dtype)
+        self._mean = np.zeros(capacity, dtype=dtype)
+        self._count = np.zeros(capacity, dtype=np.int64)
+
+        # Следующая позиция записи и число заполненных ячеек
+        self._head = 0
+        self._size = 0
+
+        # Открытый (ещё не завершённый) интервал
+        self._bucket: int | None = None
+        self._omin = self._omax = self._osum = 0.0
+        self._ocount = 0
+
+        self._lock = threading.Lock()
+
+    @property
+    def oldest(self) -> float:
+        """Начало самого старого хранимого интервала"""
+        if self._size:
+            return float(self._ts[(self._head - self._size) % len(self._ts)])
+        if self._bucket is not None:
+            return self._bucket * self.resolution
+        return math.inf
+
+    @property
+    def complete(self) -> bool:
+        """Кольцо ещё не переполнялось: хранятся все интервалы с начала"""
+        return self._size < len(self._ts)
+
+    def add(self, ts: float, value: float) -> None:
+        bucket = math.floor(ts / self.resolution)
+
+        with self._lock:
+            if bucket == self._bucket:
+                if value < self._omin:
+                    self._omin = value
+                if value > self._omax:
+                    self._omax = value
+                self._osum += value
+                self._ocount += 1
+                return
+
+            if self._bucket is not None:
+                self._close()
+
+            self._bucket = bucket
+            self._omin = self._omax = self._osum = value
+            self._ocount = 1
+
+    def merge(self, ts: float, value: float) -> None:
+        """
+        Опоздавший отсчёт: учитывается в своём интервале,
+        даже если тот уже закрыт (пока интервал хранится)
+        """
+        bucket = math.floor(ts / self.resolution)
+
+        with self._lock:
+            late = self._bucket is not None and bucket < self._bucket
+            if late:
+                start = bucket * self.resolution
+                for s in self._segments():
+                    i = s.start + int(np.searchsorted(self._ts[s], start))
+                    if i < s.stop and self._ts[i] == start:
+                        count = self._count[i]
+                        self._min[i] = min(self._min[i], value)
+                        self._max[i] = max(self._max[i], value)
+                        self._mean[i] = (self._mean[i] * count + value) / (count + 1)
+                        self._count[i] = count + 1
+                        break
+
+        if not late:
+            self.add(ts, value)
+
+    def _close(self) -> None:
+        i = self._head
+        self._ts[i] = self._bucket * self.resolution
+        self._min[i] = self._omin
+        self._max[i] = self._omax
+        self._mean[i] = self._osum / self._ocount
+        self._count[i] = self._ocount
+
+        self._head = (i + 1) % len(self._ts)
+        self._size = min(self._size + 1, len(self._ts))
+
+    def _segments(self) -> list[slice]:
+        """Заполненные участки кольца в порядке времени"""
+        capacity = len(self._ts)
+        if self._size < capacity:
+            return [slice(self._head - self._size, self._head)]
+        return [slice(self._head, capacity), slice(0, self._head)]
+
+    def query(self, start: float, end: float) -> tuple[np.ndarray, ...]:
+        """
+        Интервалы, начинающиеся в [start - resolution, end].
+
+        Returns:
+            ts, min, max, mean, count — по возрастанию времени
+        """
+        start -= self.resolution
+        columns = (self._ts, self._min, self._max, self._mean, self._count)
+
+        with self._lock:
+            parts = []
+            for s in self._segments():
+                ts = self._ts[s]
+                i = s.start + int(np.searchsorted(ts, start))
+                j = s.start + int(np.searchsorted(ts, end, side="right"))
+                parts.append(slice(i, j))
+
+            result = [np.concatenate([c[p] for p in parts]) for c in columns]
+
+            if self._bucket is not None and start <= self._bucket * self.resolution <= end:
+                opened = (
+                    self._bucket * self.resolution,
+                    self._omin,
+                    self._omax,
+                    self._osum / self._ocount,
+                    self._ocount,
+                )
+                result = [np.append(c, v).astype(c.dtype) for c, v in zip(result, opened)]
+
+        return tuple(result)
+
+
+def downsample(
+        ts: np.ndarray,
+        mn: np.ndarray,
+        mx: np.ndarray,
+        mean: np.ndarray,
+        count: np.ndarray,
+        max_points: int,
+) -> tuple[np.ndarray, ...]:
+    """Объединяет соседние интервалы так, чтобы их осталось не больше max_points"""
+    n = len(ts)
+    if n <= max_points:
+        return ts, mn, mx, mean, count
+
+    step = math.ceil(n / max_points)
+    idx = np.arange(0, n, step)
+
+    total = np.add.reduceat(count, idx)
+    weighted = np.add.reduceat(mean * count, idx)
+
+    return (
+        ts[idx],
+        np.minimum.reduceat(mn, idx),
+        np.maximum.reduceat(mx, idx),
+        (weighted / np.maximum(total, 1)).astype(mean.dtype),
+        total,
+    )
@@ -8,7 +8,8 @@ def normally_noisy(
         start: float = 0,
         end: float = 1,
         density: int = 100,
-        noise_sigma: float = 0.15
+        noise_sigma: float = 0.15,
+        rng: np.random.Generator | None = None,
 ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
     """
     Генерируем сигнал с нормально распределенным шумом и заданными параметрами
@@ -18,10 +19,11 @@ def normally_noisy(
     :param end:
     :param density:
     :param noise_sigma:
+    :param rng: генератор шума; по умолчанию глобальный np.random
     :return:
     """
     t = np.linspace(start, end, density)
     true_signal = func(t)
-    noise = np.random.normal(0, noise_sigma, len(true_signal))
+    noise = (rng or np.random).normal(0, noise_sigma, len(true_signal))
     signal = true_signal + noise
     return t, true_signal, signal
@@ -0,0 +1,160 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from filter_params.metrics import attenuation_db, lag_from_spectra
+from signal_sources.base import SignalSource
+
+
+class SpectrumEngine:
+    """
+    Инкрементальный спектр потока: перекрывающиеся окна длиной nfft
+    с шагом hop, rfft каждого окна.
+
+    При каждом update() берутся только отсчёты, пришедшие с прошлого
+    вызова (по счётчику буфера источника), и считаются только новые
+    окна — одним пакетным rfft в заранее выделенные буферы. Хвост,
+    которого не хватило на целое окно, переносится в следующий вызов.
+
+    Спектры хранятся в кольце на frames окон; spectrogram() — мощность
+    в дБ для графика, recent() — комплексные спектры для метрик.
+
+    Частота дискретизации оценивается по медиане интервалов между
+    отметками времени (источники не гарантируют равномерность).
+
+    Пример:
+        engine = SpectrumEngine(source, nfft=256)
+        ...
+        engine.update()
+        image = engine.spectrogram()   # (frames, nfft // 2 + 1)
+    """
+
+    def __init__(
+            self,
+            source: SignalSource,
+            nfft: int = 256,
+            hop: int | None = None,
+            frames: int = 256,
+            window: np.ndarray | None = None,
+    ):
+        self.source = source
+        self.nfft = nfft
+        self.hop = hop or nfft // 4
+        self.frames = frames
+        self.window = np.hanning(nfft) if window is None else np.asarray(window, dtype=float)
+        self.fs: float | None = None
+
+        bins = nfft // 2 + 1
+        # Рабочие буферы пакета окон и их спектров
+        self._work = np.empty((frames, nfft))
+        self._fft = np.empty((frames, bins), dtype=complex)
+
+        # Кольцо спектров: следующая позиция записи и число заполненных окон
+        self._spectra = np.zeros((frames, bins), dtype=complex)
+        self._power = np.zeros((frames, bins))
+        self._head = 0
+        self._size = 0
+
+        self._seen = 0
+        self._tail = np.empty(0)
+        # Последний таймстемп предыдущего пакета — для оценки fs на стыке
+        self._last_ts: float | None = None
+
+    @property
+    def freqs(self) -> np.ndarray:
+        return np.fft.rfftfreq(self.nfft, 1 / (self.fs or 1.0))
+
+    def update(self) -> int:
+        """Обрабатывает новые отсчёты источника; возвращает число новых окон"""
+        ts, values, self._seen = self.source.get_since(self._seen)
+        if not len(values):
+            return 0
+
+        # Пакеты бывают по одному отсчёту: интервалы считаются и через их границу
+        stamps = ts if self._last_ts is None else np.concatenate(([self._last_ts], ts))
+        self._last_ts = float(ts[-1])
+        if len(stamps) > 1:
+            dt = float(np.median(np.diff(stamps)))
+            if dt > 0:
+                self.fs = 1 / dt
+
+        data = np.concatenate([self._tail, values.astype(float, copy=False)])
+        if len(data) < self.nfft:
+            self._tail = data
+            return 0
+
+        count = 1 + (len(data) - self.nfft) // self.hop
+        self._tail = data[count * self.hop:]
+
+        # Больше кольца за раз не сохранить — старые окна не считаем
+        k = min(count, self.frames)
+        windows = sliding_window_view(data, self.nfft)[::self.hop][count - k:count]
+
+        np.multiply(windows, self.window, out=self._work[:k])
+        np.fft.rfft(self._work[:k], axis=-1, out=self._fft[:k])
+        self._store(self._fft[:k])
+        return count
+
+    def _store(self, spectra: np.ndarray) -> None:
+        k = len(spectra)
+        idx = (self._head + np.arange(k)) % self.frames
+        self._spectra[idx] = spectra
+
+        power = np.abs(spectra) ** 2
+        np.maximum(power, 1e-20, out=power)
+        self._power[idx] = 10 * np.log10(power)
+
+        self._head = (self._head + k) % self.frames
+        self._size = min(self._size + k, self.frames)
+
+    def __len__(self) -> int:
+        """Число окон в кольце"""
+        return self._size
+
+    def _order(self, n: int) -> np.ndarray:
+        n = min(n, self._size)
+        return (self._head - n + np.arange(n)) % self.frames
+
+    def spectrogram(self) -> np.ndarray:
+        """Мощность, дБ: (frames, nfft // 2 + 1), от старых окон к новым"""
+        image = np.full_like(self._power, np.nan)
+        image[self.frames - self._size:] = self._power[self._order(self._size)]
+        return image
+
+    def recent(self, n: int) -> np.ndarray:
+        """Последние n комплексных спектров (не больше, чем есть)"""
+        return self._spectra[self._order(n)]
+
+
+def live_spectral_metrics(
+        raw: SpectrumEngine,
+        filtered: SpectrumEngine,
+        noise_band: tuple[float, float],
+        frames: int = 32,
+        freq: float | None = None,
+) -> dict | None:
+    """
+    Подавление шума и фазовая задержка фильтра по последним окнам
+    двух движков (вход и выход фильтра), без пересчёта FFT.
+
+    Потоки должны идти отсчёт в отсчёт (например каналы bank_channels
+    или исходный и отфильтрованный сигнал микрофона) — тогда окна
+    движков с одинаковыми параметрами совпадают по времени.
+    """
+    n = min(frames, len(raw), len(filtered))
+    if n == 0 or raw.fs is None:
+        return None
+
+    s_raw, s_filt = raw.recent(n), filtered.recent(n)
+    freqs = raw.freqs
+    phase, lag = lag_from_spectra(freqs, s_raw, s_filt, freq)
+
+    return {
+        "ATTENUATION": attenuation_db(
+            freqs,
+            np.mean(np.abs(s_raw) ** 2, axis=0),
+            np.mean(np.abs(s_filt) ** 2, axis=0),
+            noise_band,
+        ),
+        "PHASE": phase,
+        "LAG": lag,
+    }
@@ -0,0 +1,55 @@
+"""
+Память и скорость float32 против float64.
+
+Запуск из корня репозитория:
+    python -m tests.bench_dtype
+"""
+import time
+
+import numpy as np
+
+from filters.bank import FilterBank
+from filters.kalman import KalmanFilter
+from signal_sources.buffer import SampleBuffer
+
+
+def bench_buffer(n: int = 1_000_000):
+    ts = np.arange(n, dtype=np.float64)
+    values = np.random.default_rng(0).normal(size=n)
+
+    for dtype in (np.float64, np.float32):
+        buffer = SampleBuffer(dtype)
+        start = time.perf_counter()
+        for i in range(0, n, 1000):
+            buffer.extend(ts[i:i + 1000], values[i:i + 1000])
+        elapsed = time.perf_counter() - start
+
+        print(
+            f"buffer  {np.dtype(dtype).name:8} {buffer.nbytes / 2 ** 20:6.1f} MB, "
+            f"extend {n / elapsed / 1e6:5.1f} M samples/s"
+        )
+
+
+def bench_bank(channels: int = 256, n: int = 2000):
+    z = np.random.default_rng(0).normal(size=n)
+    filters = [KalmanFilter(1, 1, q, 1) for q in np.linspace(0.001, 0.1, channels)]
+
+    results = {}
+    for dtype in (np.float64, np.float32):
+        bank = FilterBank(filters, dtype=dtype)
+        start = time.perf_counter()
+        results[dtype] = bank.filter(z.astype(dtype))
+        elapsed = time.perf_counter() - start
+
+        print(
+            f"bank    {np.dtype(dtype).name:8} {results[dtype].nbytes / 2 ** 20:6.1f} MB out, "
+            f"{n * channels / elapsed / 1e6:5.2f} M channel-steps/s"
+        )
+
+    error = np.max(np.abs(results[np.float32] - results[np.float64]))
+    print(f"bank    max |float32 - float64| = {error:.2e}")
+
+
+if __name__ == "__main__":
+    bench_buffer()
+    bench_bank()
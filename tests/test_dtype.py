@@ -0,0 +1,106 @@
+"""
+Точность float32 против float64.
+
+Пороги фиксируют компромисс, описанный в readme ("Точность float32"):
+Калман, банк и IMM в float32 почти не отличаются от float64,
+фильтр Язвинского теряет заметно больше.
+"""
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from filters.bank import FilterBank
+from filters.imm import IMMFilter
+from filters.kalman import KalmanFilter
+from filters.unscented import UnscentedKalmanFilter
+from filters.yazvinsky import YazvinskyFilter
+from signal_sources.buffer import SampleBuffer
+from signal_sources.derived import DerivedSource
+
+
+@pytest.fixture
+def measurements():
+    rng = np.random.default_rng(0)
+    t = np.linspace(0, 6 * np.pi, 5000)
+    return np.sin(t) + rng.normal(0, 0.3, len(t))
+
+
+def relative_error(f32, f64):
+    return np.max(np.abs(f32 - f64)) / np.max(np.abs(f64))
+
+
+@pytest.mark.parametrize("make, tolerance", [
+    (lambda dtype: KalmanFilter(1, 1, 0.01, 1, dtype=dtype), 1e-5),
+    (lambda dtype: FilterBank(
+        [KalmanFilter(1, 1, q, 1) for q in (0.001, 0.01, 0.1)], dtype=dtype
+    ), 1e-5),
+    (lambda dtype: IMMFilter(
+        [KalmanFilter(1, 1, 0.001, 1), KalmanFilter(1, 1, 0.1, 1)],
+        [[0.95, 0.05], [0.05, 0.95]],
+        dtype=dtype,
+    ), 1e-5),
+    (lambda dtype: YazvinskyFilter(1, 1, 0.2, 0.001, dtype=dtype), 1e-1),
+], ids=["kalman", "bank", "imm", "yazvinsky"])
+def test_float32_matches_float64(measurements, make, tolerance):
+    f64 = make(np.float64).filter(measurements)
+    f32 = make(np.float32).filter(measurements.astype(np.float32))
+
+    assert f32.dtype == np.float32
+    assert f64.dtype == np.float64
+    assert relative_error(f32, f64) < tolerance
+
+
+def test_unscented_float32_matches_linear_kalman(measurements):
+    # Линейная модель: UKF совпадает с KalmanFilter; веса ~1e6 не портят float32
+    expected = KalmanFilter(1, 1, 0.01, 1).filter(measurements)
+    ukf = UnscentedKalmanFilter(lambda X: X, lambda X: X, 0.01, 1, dtype=np.float32)
+
+    result = ukf.filter(measurements)
+
+    assert result.dtype == np.float32
+    assert relative_error(result, expected) < 1e-5
+
+
+def test_float32_buffer_size():
+    # Таймстемпы всегда float64: float32 экономит треть памяти буфера
+    n = 100_000
+    ts = np.arange(n, dtype=np.float64)
+    sizes = {}
+    for dtype in (np.float64, np.float32):
+        buffer = SampleBuffer(dtype)
+        buffer.extend(ts, np.zeros(n))
+        sizes[dtype] = buffer.nbytes
+
+    assert sizes[np.float64] == n * 16
+    assert sizes[np.float32] == n * 12
+
+
+def test_float32_bank_state_size():
+    filters = [KalmanFilter(1, 1, q, 1) for q in np.linspace(0.001, 0.1, 256)]
+    f64 = FilterBank(filters, dtype=np.float64)
+    f32 = FilterBank(filters, dtype=np.float32)
+
+    assert f32.state.nbytes * 2 == f64.state.nbytes
+    assert f32.covariance.nbytes * 2 == f64.covariance.nbytes
+
+
+def test_source_stores_dtype():
+    source = DerivedSource(livetime=timedelta(minutes=1), dtype=np.float32)
+    source.feed(1.5)
+
+    _, values = source.get_arrays()
+    assert values.dtype == np.float32
+
+
+def test_source_accepts_one_step_output():
+    # one_step возвращает массив (1, 1) — он сохраняется как скаляр
+    source = DerivedSource(livetime=timedelta(minutes=1))
+    kalman = KalmanFilter(1, 1, 0.01, 1)
+
+    source.feed(kalman.one_step(1.0))
+    source.feed_many([kalman.one_step(2.0), kalman.one_step(3.0)], [datetime.now()] * 2)
+
+    values = source.get_values()
+    assert len(values) == 3
+    assert all(isinstance(value, float) for value in values)
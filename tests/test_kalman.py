@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+from filters.kalman import KalmanFilter
+
+
+@pytest.mark.parametrize("args", [
+    (1, 1, 0.01, 0.25),
+    (0.95, 1.2, 0.02, 0.3),
+    ([[1, 1], [0, 1]], [[1, 0]], np.eye(2) * 1e-3, 0.5, [0, 0], np.eye(2)),
+], ids=["scalar", "scaled", "velocity"])
+def test_steady_log_likelihood_matches_loop(args):
+    rng = np.random.default_rng(0)
+    z = np.cumsum(rng.normal(0, 0.1, 5000)) + rng.normal(0, 0.5, 5000)
+
+    # Массив — блочный установившийся режим, список — шаг за шагом
+    blocked, stepped = KalmanFilter(*args), KalmanFilter(*args)
+
+    assert blocked.log_likelihood(z) == pytest.approx(stepped.log_likelihood(list(z)), rel=1e-12)
+    np.testing.assert_allclose(blocked.state, stepped.state)
+
+
+def test_filter_iter_blocks_matches_filter():
+    rng = np.random.default_rng(1)
+    z = np.cumsum(rng.normal(0, 0.1, 1000)) + rng.normal(0, 0.5, 1000)
+
+    blocks = list(KalmanFilter(1, 1, 0.01, 0.25).filter_iter(np.array_split(z, 7), blocks=True))
+
+    assert [len(b) for b in blocks] == [len(c) for c in np.array_split(z, 7)]
+    np.testing.assert_allclose(np.concatenate(blocks), KalmanFilter(1, 1, 0.01, 0.25).filter(z))
+
+
+def test_per_step_parameters_follow_measurements():
+    z = np.random.default_rng(2).normal(size=100)
+    expected = KalmanFilter(1, 1, 0.01, 2.0).filter(z)
+
+    # out длиннее входа: R по шагам сверяется с числом измерений
+    out = np.empty((1000, 1))
+    np.testing.assert_allclose(KalmanFilter(1, 1, 0.01, 1.0).filter(z, out=out, R=np.full(100, 2.0)), expected)
+
+    # Массив из одного значения — постоянный параметр
+    np.testing.assert_allclose(KalmanFilter(1, 1, 0.01, 1.0).filter(z, R=[2.0]), expected)
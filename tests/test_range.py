@@ -0,0 +1,22 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from signal_sources.derived import DerivedSource
+
+
+def test_range_uses_finest_covering_level():
+    # 10 минут по 100 Гц при истории 6 ч
+    source = DerivedSource(livetime=timedelta(seconds=5), history=timedelta(hours=6))
+    now = datetime.now()
+    n = 60_000
+    ts = [now - timedelta(seconds=600) + timedelta(seconds=i / 100) for i in range(n)]
+    source.feed_many(np.sin(np.arange(n) / 100), ts)
+
+    # Уровень 1 с покрывает все 10 минут
+    ts, _, _, _ = source.get_range(now - timedelta(hours=6), now, max_points=800)
+    assert 500 < len(ts) <= 800
+
+    # Уровень 10 мс, прореженный до max_points
+    ts, _, _, _ = source.get_range(now - timedelta(minutes=1), now, max_points=800)
+    assert 500 < len(ts) <= 800
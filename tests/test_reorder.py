@@ -0,0 +1,39 @@
+from datetime import datetime, timedelta
+
+from signal_sources.derived import DerivedSource
+
+
+def test_late_samples_are_kept_in_order():
+    source = DerivedSource(livetime=timedelta(minutes=1), lateness=timedelta(milliseconds=200))
+    received = []
+    source.subscribe(lambda value, ts: received.append(value))
+
+    now = datetime.now() - timedelta(seconds=10)
+    source.feed(1.0, now)
+    source.feed(0.9, now - timedelta(milliseconds=100))  # в окне
+    source.feed(2.0, now + timedelta(seconds=1))
+    source.feed(0.5, now - timedelta(seconds=1))         # старше окна
+
+    assert source.get_values() == [0.5, 0.9, 1.0, 2.0]
+    assert received == [0.9, 1.0, 2.0]
+    assert source.get_stats()["late"] == 1
+    assert source.get_stats()["inserted"] == 1
+
+
+def test_since_after_late_insert():
+    source = DerivedSource(livetime=timedelta(minutes=1))
+    now = datetime.now() - timedelta(seconds=10)
+
+    source.feed(1.0, now)
+    _, _, total = source.get_since(0)
+
+    source.feed(3.0, now + timedelta(seconds=3))
+    source.feed(4.0, now + timedelta(seconds=4))
+    source.feed(3.5, now + timedelta(seconds=3.5))  # среди новых
+    _, values, total = source.get_since(total)
+    assert values.tolist() == [3.0, 3.5, 4.0]
+
+    source.feed(0.5, now - timedelta(seconds=1))    # среди прочитанных
+    source.feed(5.0, now + timedelta(seconds=5))
+    _, values, _ = source.get_since(total)
+    assert values.tolist() == [5.0]
@@ -0,0 +1,32 @@
+import numpy as np
+
+from signal_sources.process import SharedRing
+
+
+def test_ring_reads_after_wrap():
+    ring = SharedRing.create(8)
+    try:
+        for i in range(20):
+            ring.append(float(i), i * 10.0)
+
+        # Ячейку, которую писатель перезапишет следующей, кольцо не отдаёт
+        ts, values = ring.arrays()
+        assert ts.tolist() == [13.0, 14.0, 15.0, 16.0, 17.0, 18.0, 19.0]
+        assert len(ring) == 7 and not ring.complete
+        assert ring.oldest == 13.0
+
+        ts, values = ring.range(15.0, 17.5)
+        assert ts.tolist() == [15.0, 16.0, 17.0]
+        assert values.tolist() == [150.0, 160.0, 170.0]
+
+        ts, _, total = ring.since(17)
+        assert ts.tolist() == [17.0, 18.0, 19.0] and total == 20
+        ts, _, _ = ring.since(0)
+        assert len(ts) == 7
+
+        ring.drop_before(18.0)
+        assert ring.oldest == 18.0 and len(ring) == 2
+        assert np.array_equal(ring.range(0.0, 100.0)[0], [18.0, 19.0])
+    finally:
+        ring.close()
+        ring.unlink()
@@ -0,0 +1,18 @@
+from datetime import datetime, timedelta
+
+from signal_sources.derived import DerivedSource
+from signals.spectrum import SpectrumEngine
+
+
+def test_fs_estimated_from_single_sample_updates():
+    source = DerivedSource(livetime=timedelta(minutes=1))
+    engine = SpectrumEngine(source, nfft=16)
+
+    start = datetime.now() - timedelta(seconds=5)
+    for i in range(40):
+        source.feed(float(i % 3), start + timedelta(milliseconds=10 * i))
+        engine.update()
+
+    assert engine.fs is not None and abs(engine.fs - 100) < 0.1
+    assert abs(engine.freqs[-1] - 50) < 0.1
+    assert len(engine) > 0